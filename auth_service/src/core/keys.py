@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk
+
+logger = logging.getLogger(__name__)
+
+_EC_CURVES = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1, "ES512": ec.SECP521R1}
+
+
+@dataclass
+class SigningKey:
+    kid: str
+    private_pem: str
+    public_jwk: dict
+    created_at: float
+
+
+def _generate_private_pem(algorithm: str) -> bytes:
+    if algorithm in _EC_CURVES:
+        private_key = ec.generate_private_key(_EC_CURVES[algorithm]())
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+class KeyRing:
+    """Набор ключей подписи в каталоге (по файлу <kid>.pem на ключ).
+
+    Каталог общий для всех воркеров, поэтому его периодически перечитываем.
+    Новый ключ генерируется за activation_seconds до конца rotation_seconds
+    текущего и сразу попадает в JWKS, а подписывать им начинаем, только
+    когда его увидели все воркеры (reload_seconds) и истекли JWKS,
+    закэшированные клиентами (publish_ahead_seconds). Ключ, которым
+    перестали подписывать, остаётся в JWKS ещё retention_seconds, чтобы
+    выданные им токены можно было проверить до истечения.
+
+    После start() каталог перечитывает фоновая задача в потоке
+    run_in_executor, а запросы только читают ключи из памяти. Без start()
+    (скрипты, тесты) ключи перечитываются при обращении.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        algorithm: str,
+        rotation_seconds: float,
+        retention_seconds: float,
+        reload_seconds: float = 60,
+        publish_ahead_seconds: float = 0,
+    ):
+        self.directory = Path(directory)
+        self.algorithm = algorithm
+        self.rotation_seconds = rotation_seconds
+        self.retention_seconds = retention_seconds
+        self.reload_seconds = reload_seconds
+        self.activation_seconds = min(
+            reload_seconds + publish_ahead_seconds, rotation_seconds
+        )
+        self._keys: Dict[str, SigningKey] = {}
+        self._loaded_at = 0.0
+        self._forced_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _load(self) -> None:
+        keys = {}
+        for path in self.directory.glob("*.pem"):
+            pem = path.read_text()
+            public_jwk = jwk.construct(pem, self.algorithm).public_key().to_dict()
+            public_jwk.update({"kid": path.stem, "use": "sig"})
+            keys[path.stem] = SigningKey(
+                kid=path.stem,
+                private_pem=pem,
+                public_jwk=public_jwk,
+                created_at=path.stat().st_mtime,
+            )
+        self._keys = keys
+        self._loaded_at = time.monotonic()
+
+    def _newest(self) -> Optional[SigningKey]:
+        return max(self._keys.values(), key=lambda k: k.created_at, default=None)
+
+    def _active(self) -> Optional[SigningKey]:
+        now = time.time()
+        published = [
+            key
+            for key in self._keys.values()
+            if now - key.created_at >= self.activation_seconds
+        ]
+        active = max(published, key=lambda k: k.created_at, default=None)
+        # при первом запуске опубликованного заранее ключа ещё нет
+        return active or self._newest()
+
+    def _rotate(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        kid = f"{time.strftime('%Y%m%d%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:8]}"
+        tmp_path = self.directory / f".{kid}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(_generate_private_pem(self.algorithm))
+        os.replace(tmp_path, self.directory / f"{kid}.pem")
+
+    def _prune(self) -> None:
+        active = self._active()
+        if active is None:
+            return
+        # self._keys читают запросы из event loop: меняем копию и подменяем целиком
+        remaining = dict(self._keys)
+        keys = sorted(self._keys.values(), key=lambda k: k.created_at)
+        for key, successor in zip(keys, keys[1:]):
+            if successor.created_at > active.created_at:
+                # активный и ещё не включённый ключи не трогаем
+                break
+            # ключом подписывали, пока не включился следующий за ним
+            retired_at = successor.created_at + self.activation_seconds
+            if time.time() - retired_at > self.retention_seconds:
+                (self.directory / f"{key.kid}.pem").unlink(missing_ok=True)
+                del remaining[key.kid]
+        self._keys = remaining
+
+    def refresh(self, force: bool = False) -> None:
+        if not force and (
+            self._task is not None
+            or time.monotonic() - self._loaded_at < self.reload_seconds
+        ):
+            return
+        self._load()
+        newest = self._newest()
+        rotate_after = self.rotation_seconds - self.activation_seconds
+        if newest is None or time.time() - newest.created_at >= rotate_after:
+            self._rotate()
+            self._load()
+        self._prune()
+
+    def active(self) -> SigningKey:
+        self.refresh()
+        active = self._active()
+        assert active is not None, "No signing key available"
+        return active
+
+    def get(self, kid: str) -> Optional[SigningKey]:
+        self.refresh()
+        key = self._keys.get(kid)
+        # ключ мог выпустить другой воркер (при первом запуске он сразу
+        # подписывает им), но перечитываем каталог не чаще reload_seconds
+        if key is None and time.monotonic() - self._forced_at >= self.reload_seconds:
+            self._forced_at = time.monotonic()
+            if self._wakeup is not None:
+                # в фоне: этот токен отклоняем, следующие проверятся новым ключом
+                self._wakeup.set()
+            else:
+                self.refresh(force=True)
+                key = self._keys.get(kid)
+        return key
+
+    def jwks(self) -> dict:
+        self.refresh()
+        keys = sorted(self._keys.values(), key=lambda k: k.created_at, reverse=True)
+        return {"keys": [key.public_jwk for key in keys]}
+
+    async def start(self) -> None:
+        """Загружает ключи и запускает их фоновое обновление."""
+        if self._task is not None:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.refresh, True)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = self._wakeup = None
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.reload_seconds)
+            self._wakeup.clear()
+            try:
+                # чтение каталога и генерация RSA-ключа блокировали бы event loop
+                await loop.run_in_executor(None, self.refresh, True)
+            except Exception:
+                # остаёмся на ключах в памяти, попробуем через reload_seconds
+                logger.exception("Failed to reload signing keys")
@@ -1,15 +1,53 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import UTC, datetime, timedelta
-from typing import Union
+from typing import Callable, Optional, TypeVar, Union
 
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 
-from src.core.config import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRE_MINUTES
+from src.core.config import (
+    JWT_SECRET_KEY,
+    JWT_ALGORITHM,
+    JWT_EXPIRE_MINUTES,
+    JWT_KEY_ROTATION_HOURS,
+    JWT_KEYS_DIR,
+    JWKS_MAX_AGE_SECONDS,
+    PASSWORD_HASH_QUEUE_LIMIT,
+    PASSWORD_HASH_WORKERS,
+)
+from src.core.keys import KeyRing
 
-assert JWT_SECRET_KEY is not None, "JWT_SECRET_KEY is not set"
 assert JWT_ALGORITHM is not None, "JWT_ALGORITHM is not set"
 assert JWT_EXPIRE_MINUTES is not None, "JWT_EXPIRE_MINUTES is not set"
 
+# HS* подписываются общим секретом, RS*/ES* - ключами из KeyRing с публикацией в JWKS
+keyring: Optional[KeyRing] = None
+if JWT_ALGORITHM.startswith("HS"):
+    assert JWT_SECRET_KEY is not None, "JWT_SECRET_KEY is not set"
+else:
+    keyring = KeyRing(
+        JWT_KEYS_DIR,
+        JWT_ALGORITHM,
+        rotation_seconds=JWT_KEY_ROTATION_HOURS * 3600,
+        retention_seconds=JWT_EXPIRE_MINUTES * 60,
+        publish_ahead_seconds=JWKS_MAX_AGE_SECONDS,
+    )
+
+
+async def start_keyring() -> None:
+    # после старта ключи перечитываются в фоне, а не в обработчиках запросов
+    if keyring is not None:
+        await keyring.start()
+
+
+async def stop_keyring() -> None:
+    if keyring is not None:
+        await keyring.stop()
+
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(password: str) -> str:
@@ -18,15 +56,85 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None):
-    to_encode = data.copy()
+
+# bcrypt держит CPU десятки миллисекунд, поэтому считаем его в отдельных процессах,
+# чтобы не блокировать event loop остальным запросам.
+T = TypeVar("T")
+_password_pool: Optional[ProcessPoolExecutor] = None
+_password_jobs = 0
+
+
+def start_password_pool() -> None:
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+
+def shutdown_password_pool() -> None:
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(cancel_futures=True)
+        _password_pool = None
+
+
+async def _run_in_password_pool(func: Callable[..., T], *args) -> T:
+    global _password_jobs
+    if _password_jobs >= PASSWORD_HASH_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, try again later",
+            headers={"Retry-After": "1"},
+        )
+    start_password_pool()
+    _password_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_pool, func, *args)
+    finally:
+        _password_jobs -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_password_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+def create_access_token(
+    email: str,
+    user_id: int,
+    username: str,
+    expires_delta: Union[timedelta, None] = None,
+):
+    # id и username в claims позволяют отвечать на /auth/me без запроса в БД
+    to_encode = {"sub": email, "id": user_id, "username": username}
     expire = datetime.now(UTC) + (expires_delta or timedelta(minutes=JWT_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
+    if keyring is not None:
+        key = keyring.active()
+        return jwt.encode(
+            to_encode, key.private_pem, algorithm=JWT_ALGORITHM, headers={"kid": key.kid}
+        )
     return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 def decode_access_token(token: str):
     try:
+        if keyring is not None:
+            kid = jwt.get_unverified_header(token).get("kid")
+            key = keyring.get(kid) if kid else None
+            if key is None:
+                return None
+            return jwt.decode(token, key.public_jwk, algorithms=[JWT_ALGORITHM])
         decoded_jwt = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
         return decoded_jwt
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+def get_jwks() -> dict:
+    if keyring is None:
+        return {"keys": []}
+    return keyring.jwks()
\ No newline at end of file
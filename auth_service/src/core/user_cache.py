@@ -0,0 +1,40 @@
+from typing import Union
+
+from src.core.cache import TTLCache
+from src.core.config import (
+    JWT_EXPIRE_MINUTES,
+    USER_CACHE_MAX_SIZE,
+    USER_CACHE_TTL_SECONDS,
+)
+from src.schemas.user import UserResponse
+
+# Пользователь, чьи данные изменились: claims в уже выданных токенах устарели,
+# поэтому до их истечения такого пользователя перечитываем из БД.
+RELOAD = object()
+
+user_cache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+_reload_marks = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=JWT_EXPIRE_MINUTES * 60)
+
+
+def get_cached_user(email: str) -> Union[UserResponse, object, None]:
+    user = user_cache.get(email)
+    if user is not None:
+        return user
+    if _reload_marks.get(email) is not None:
+        return RELOAD
+    return None
+
+
+def cache_user(user: UserResponse) -> None:
+    user_cache.set(user.email, user)
+
+
+def invalidate_user(email: str) -> None:
+    """Вызывать при любом изменении данных пользователя."""
+    user_cache.delete(email)
+    _reload_marks.set(email, True)
+
+
+def clear_user_cache() -> None:
+    user_cache.clear()
+    _reload_marks.clear()
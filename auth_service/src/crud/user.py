@@ -1,8 +1,12 @@
+from typing import AsyncIterator, List, Sequence
+
+from sqlalchemy import Integer, Row, String, any_, bindparam, or_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from src.models.user import User
-from src.core.security import hash_password
+from src.core.security import hash_password_async
 
 
 async def create_user(
@@ -11,7 +15,7 @@ async def create_user(
     user = User(
         username=username, 
         email=email, 
-        hashed_password=hash_password(password)
+        hashed_password=await hash_password_async(password)
     )
     session.add(user)
     await session.commit()
@@ -28,3 +32,29 @@ async def get_user_by_username(session: AsyncSession, username: str) -> User | N
     result = await session.execute(select(User).filter(User.username == username))
     return result.scalars().first()
 
+
+def _users_batch_query(ids: List[int], emails: List[str]):
+    # = ANY(массив) - один параметр вместо IN ($1, ..., $N), план не зависит от размера
+    return select(User.id, User.username, User.email).where(
+        or_(
+            User.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))),
+            User.email == any_(bindparam("emails", emails, type_=ARRAY(String))),
+        )
+    )
+
+
+async def get_users_batch(
+    session: AsyncSession, ids: List[int], emails: List[str]
+) -> Sequence[Row]:
+    result = await session.execute(_users_batch_query(ids, emails))
+    return result.all()
+
+
+async def stream_users_batch(
+    session: AsyncSession, ids: List[int], emails: List[str]
+) -> AsyncIterator[Row]:
+    result = await session.stream(
+        _users_batch_query(ids, emails).execution_options(yield_per=500)
+    )
+    async for row in result:
+        yield row
@@ -1,14 +1,56 @@
 from typing import AsyncGenerator, cast
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from fastapi import Depends
 
-from src.core.config import DATABASE_URL
+from src.core.config import (
+    DATABASE_URL,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_STATEMENT_TIMEOUT_MS,
+)
 
 assert DATABASE_URL is not None, "DATABASE_URL is not set"
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+
+def engine_options(url: str) -> dict:
+    """Параметры create_async_engine из настроек DB_*.
+
+    Пул и параметры asyncpg применяются только к PostgreSQL.
+    """
+    options: dict = {"echo": DB_ECHO}
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        connect_args: dict = {
+            # кэш prepared statements SQLAlchemy и собственный кэш asyncpg
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        }
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)
+            }
+        options["connect_args"] = connect_args
+    return options
+
+
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 AsyncSessionLocal = sessionmaker(
     class_=AsyncSession, expire_on_commit=False, autoflush=False, autocommit=False
 )
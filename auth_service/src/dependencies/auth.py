@@ -1,13 +1,13 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.session import get_session
 from src.crud.user import get_user_by_email
-from src.core.config import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRE_MINUTES
+from src.core.security import decode_access_token
+from src.core.user_cache import RELOAD, cache_user, get_cached_user
 from src.schemas.token import TokenPayload
-from src.models.user import User
+from src.schemas.user import UserResponse
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -15,21 +15,35 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     session: AsyncSession = Depends(get_session),
-) -> User:
+) -> UserResponse:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    payload = decode_access_token(token)
+    if payload is None:
+        raise credentials_exception
     try:
-        assert JWT_SECRET_KEY is not None, "JWT_SECRET_KEY is not set"
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
         token_data = TokenPayload(**payload)
-    except (JWTError, ValueError):
+    except ValueError:
         raise credentials_exception
 
-    user = await get_user_by_email(session, token_data.sub)
-    if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+    cached = get_cached_user(token_data.sub)
+    if isinstance(cached, UserResponse):
+        return cached
+
+    if cached is not RELOAD and token_data.id is not None and token_data.username:
+        current_user = UserResponse(
+            id=token_data.id, username=token_data.username, email=token_data.sub
+        )
+    else:
+        # токен без id/username или данные пользователя менялись после выдачи токена
+        user = await get_user_by_email(session, token_data.sub)
+        if user is None:
+            raise credentials_exception
+        current_user = UserResponse.model_validate(user)
+
+    cache_user(current_user)
+    return current_user
\ No newline at end of file
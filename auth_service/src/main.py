@@ -1,9 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
 
+from src.core.security import (
+    shutdown_password_pool,
+    start_keyring,
+    start_password_pool,
+    stop_keyring,
+)
+from src.db.session import engine
 from src.routers.auth import router as auth_router
 
-app = FastAPI(title="Auth Service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_password_pool()
+    await start_keyring()
+    yield
+    await stop_keyring()
+    shutdown_password_pool()
+    await engine.dispose()
+
+
+app = FastAPI(title="Auth Service", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
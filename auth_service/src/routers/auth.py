@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.schemas.user import *
 from src.schemas.token import *
-from src.models.user import User
-from src.crud.user import create_user, get_user_by_email, get_user_by_username
-from src.db.session import get_session
-from src.core.security import verify_password, create_access_token
+from src.crud.user import (
+    create_user,
+    get_user_by_email,
+    get_user_by_username,
+    get_users_batch,
+    stream_users_batch,
+)
+from src.db.session import AsyncSessionLocal, get_session
+from src.core.config import JWKS_MAX_AGE_SECONDS
+from src.core.security import verify_password_async, create_access_token, get_jwks
 from src.dependencies.auth import get_current_user
 
 
@@ -46,10 +53,14 @@ async def login(
     session: AsyncSession = Depends(get_session),
 ):
     user = await get_user_by_email(session, form_data.username)
-    if not user or not verify_password(form_data.password, str(user.hashed_password)):
+    if not user or not await verify_password_async(
+        form_data.password, str(user.hashed_password)
+    ):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(
+        str(user.email), int(user.id), str(user.username)  # type: ignore
+    )
     return TokenResponse(access_token=access_token)
 
 
@@ -59,9 +70,41 @@ async def login(
     status_code=status.HTTP_200_OK,
     summary="Ручка для получения данных текущего пользователя",
 )
-async def get_me(current_user: User = Depends(get_current_user)):
-    return {
-        "id": current_user.id,
-        "email": current_user.email,
-        "username": current_user.username,
-    }
+async def get_me(current_user: UserResponse = Depends(get_current_user)):
+    return current_user
+
+
+@router.get(
+    "/.well-known/jwks.json",
+    status_code=status.HTTP_200_OK,
+    summary="Публичные ключи для проверки токенов (JWKS)",
+)
+async def jwks(response: Response):
+    response.headers["Cache-Control"] = f"public, max-age={JWKS_MAX_AGE_SECONDS}"
+    return get_jwks()
+
+
+async def _stream_users(batch: UserBatchRequest):
+    # сессия из Depends закрывается до отправки тела, поэтому открываем свою
+    async with AsyncSessionLocal() as session:  # type: ignore
+        async for user in stream_users_batch(session, batch.ids, batch.emails):
+            yield UserResponse.model_validate(user).model_dump_json() + "\n"
+
+
+@router.post(
+    "/users/batch",
+    response_model=List[UserResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Получить пользователей списком по id или email",
+)
+async def users_batch(
+    batch: UserBatchRequest,
+    stream: bool = False,
+    current_user: UserResponse = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    if stream:
+        return StreamingResponse(
+            _stream_users(batch), media_type="application/x-ndjson"
+        )
+    return await get_users_batch(session, batch.ids, batch.emails)
@@ -1,4 +1,8 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+
+from src.core.config import USER_BATCH_MAX_SIZE
 
 
 class UserCreate(BaseModel):
@@ -18,3 +22,8 @@ class UserResponse(BaseModel):
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
+
+
+class UserBatchRequest(BaseModel):
+    ids: List[int] = Field(default_factory=list, max_length=USER_BATCH_MAX_SIZE)
+    emails: List[EmailStr] = Field(default_factory=list, max_length=USER_BATCH_MAX_SIZE)
@@ -1,6 +1,14 @@
+import asyncio
+import os
+
 from httpx import AsyncClient
 import pytest
 from fastapi import status
+from jose import jwt
+
+from src.core import security
+from src.core.keys import KeyRing
+from src.core.security import create_access_token, decode_access_token
 
 
 @pytest.mark.asyncio
@@ -107,3 +115,152 @@ async def test_me_unauthorized(client: AsyncClient):
 
     assert me_resp.status_code == status.HTTP_401_UNAUTHORIZED
     assert "not authenticated" in me_resp.json()["detail"].lower()
+
+
+@pytest.mark.asyncio
+async def test_token_contains_user_claims(client: AsyncClient):
+    user_data = {
+        "username": "claimsuser",
+        "email": "claimsuser@example.com",
+        "password": "securepass",
+    }
+    register_resp = await client.post("/auth/register", json=user_data)
+    assert register_resp.status_code == status.HTTP_201_CREATED
+
+    login_data = {"username": user_data["email"], "password": user_data["password"]}
+    login_resp = await client.post("/auth/login", data=login_data)
+    token = login_resp.json()["access_token"]
+
+    payload = decode_access_token(token)
+    assert payload is not None
+    assert payload["sub"] == user_data["email"]
+    assert payload["id"] == register_resp.json()["id"]
+    assert payload["username"] == user_data["username"]
+
+
+@pytest.mark.asyncio
+async def test_jwks(client: AsyncClient, tmp_path, monkeypatch):
+    keyring = KeyRing(
+        str(tmp_path), "RS256", rotation_seconds=3600, retention_seconds=60
+    )
+    monkeypatch.setattr(security, "keyring", keyring)
+    monkeypatch.setattr(security, "JWT_ALGORITHM", "RS256")
+    token = create_access_token("jwks@example.com", 1, "jwks")
+
+    jwks_resp = await client.get("/auth/.well-known/jwks.json")
+
+    assert jwks_resp.status_code == status.HTTP_200_OK
+    assert "max-age" in jwks_resp.headers["cache-control"]
+    keys = {key["kid"]: key for key in jwks_resp.json()["keys"]}
+    kid = jwt.get_unverified_header(token)["kid"]
+    assert keys[kid]["use"] == "sig"
+    payload = jwt.decode(token, keys[kid], algorithms=["RS256"])
+    assert payload["sub"] == "jwks@example.com"
+    assert decode_access_token(token)["id"] == 1
+
+
+def test_key_ring_publishes_next_key_before_signing(tmp_path):
+    keyring = KeyRing(
+        str(tmp_path),
+        "RS256",
+        rotation_seconds=3600,
+        retention_seconds=60,
+        reload_seconds=0,
+        publish_ahead_seconds=300,
+    )
+    first = keyring.active()
+
+    # первый ключ подходит к концу ротации: следующий уже в JWKS, но не подписывает
+    age_keys(tmp_path, 3600 - 200)
+    keyring.refresh(force=True)
+    kids = [key["kid"] for key in keyring.jwks()["keys"]]
+    assert len(kids) == 2 and first.kid in kids
+    assert keyring.active().kid == first.kid
+
+    # следующий ключ опубликован дольше publish_ahead_seconds - подписываем им
+    age_keys(tmp_path, 330)
+    keyring.refresh(force=True)
+    second = keyring.active()
+    assert second.kid != first.kid
+    assert first.kid in [key["kid"] for key in keyring.jwks()["keys"]]
+
+    # через retention_seconds после переключения старый ключ убирается
+    age_keys(tmp_path, 100)
+    keyring.refresh(force=True)
+    assert [key["kid"] for key in keyring.jwks()["keys"]] == [second.kid]
+
+
+@pytest.mark.asyncio
+async def test_key_ring_reloads_in_background(tmp_path, monkeypatch):
+    keyring = KeyRing(
+        str(tmp_path), "RS256", rotation_seconds=3600, retention_seconds=60
+    )
+    await keyring.start()
+    try:
+        first = keyring.active()
+        loads = []
+        load = keyring._load
+        monkeypatch.setattr(keyring, "_load", lambda: loads.append(1) or load())
+
+        # запросы не читают каталог, даже если reload_seconds истекли
+        keyring._loaded_at -= 3600
+        assert keyring.active().kid == first.kid
+        assert keyring.get(first.kid) is first
+        assert loads == []
+
+        # неизвестный kid будит фоновую перезагрузку, но не чаще reload_seconds
+        assert keyring.get("unknown") is None
+        assert keyring.get("other") is None
+        for _ in range(100):
+            if loads:
+                break
+            await asyncio.sleep(0.01)
+        assert loads == [1]
+    finally:
+        await keyring.stop()
+
+
+def test_key_ring_forced_reload_is_rate_limited(tmp_path, monkeypatch):
+    keyring = KeyRing(
+        str(tmp_path), "RS256", rotation_seconds=3600, retention_seconds=60
+    )
+    keyring.active()
+    loads = []
+    load = keyring._load
+    monkeypatch.setattr(keyring, "_load", lambda: loads.append(1) or load())
+
+    assert keyring.get("unknown") is None
+    assert keyring.get("other") is None
+    assert loads == [1]
+
+
+def age_keys(directory, seconds: float) -> None:
+    for path in directory.glob("*.pem"):
+        mtime = path.stat().st_mtime - seconds
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.asyncio
+async def test_users_batch(client: AsyncClient):
+    users = [
+        {"username": "batch1", "email": "batch1@example.com", "password": "pass1"},
+        {"username": "batch2", "email": "batch2@example.com", "password": "pass2"},
+    ]
+    ids = []
+    for user_data in users:
+        register_resp = await client.post("/auth/register", json=user_data)
+        assert register_resp.status_code == status.HTTP_201_CREATED
+        ids.append(register_resp.json()["id"])
+
+    login_data = {"username": users[0]["email"], "password": users[0]["password"]}
+    login_resp = await client.post("/auth/login", data=login_data)
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    batch_resp = await client.post(
+        "/auth/users/batch",
+        json={"ids": [ids[0]], "emails": [users[1]["email"]]},
+        headers=headers,
+    )
+
+    assert batch_resp.status_code == status.HTTP_200_OK
+    assert {user["username"] for user in batch_resp.json()} == {"batch1", "batch2"}
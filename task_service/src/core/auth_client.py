@@ -0,0 +1,71 @@
+from typing import Optional
+
+from httpx import AsyncClient, Limits, Timeout
+
+from src.core.circuit_breaker import CircuitBreaker
+from src.core.config import (
+    AUTH_BREAKER_FAILURE_THRESHOLD,
+    AUTH_BREAKER_HALF_OPEN_PROBES,
+    AUTH_BREAKER_RESET_SECONDS,
+    AUTH_BREAKER_SLOW_CALL_SECONDS,
+    AUTH_HTTP_CONNECT_TIMEOUT,
+    AUTH_HTTP_KEEPALIVE_EXPIRY,
+    AUTH_HTTP_MAX_CONNECTIONS,
+    AUTH_HTTP_MAX_KEEPALIVE,
+    AUTH_HTTP_TIMEOUT,
+    AUTH_SERVICE_URL,
+)
+
+limits = Limits(
+    max_connections=AUTH_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=AUTH_HTTP_MAX_KEEPALIVE,
+    keepalive_expiry=AUTH_HTTP_KEEPALIVE_EXPIRY,
+)
+timeout = Timeout(AUTH_HTTP_TIMEOUT, connect=AUTH_HTTP_CONNECT_TIMEOUT)
+
+breaker = CircuitBreaker(
+    failure_threshold=AUTH_BREAKER_FAILURE_THRESHOLD,
+    slow_call_seconds=AUTH_BREAKER_SLOW_CALL_SECONDS,
+    reset_timeout=AUTH_BREAKER_RESET_SECONDS,
+    half_open_probes=AUTH_BREAKER_HALF_OPEN_PROBES,
+)
+
+_client: Optional[AsyncClient] = None
+
+
+async def start_auth_client() -> None:
+    global _client
+    if _client is None and AUTH_SERVICE_URL is not None:
+        _client = AsyncClient(base_url=AUTH_SERVICE_URL, limits=limits, timeout=timeout)
+
+
+async def close_auth_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_auth_client() -> AsyncClient:
+    # без lifespan (например, в тестах через ASGITransport) клиент создаётся лениво
+    if _client is None:
+        await start_auth_client()
+    assert _client is not None, "AUTH_SERVICE_URL is not set"
+    return _client
+
+
+def pool_config() -> dict:
+    """Настройки пула соединений к auth_service.
+
+    Число открытых соединений httpx публично не отдаёт, а читать его
+    внутренности (_transport._pool) ненадёжно; живость auth_service видна
+    по состоянию circuit breaker.
+    """
+    return {
+        "max_connections": limits.max_connections,
+        "max_keepalive_connections": limits.max_keepalive_connections,
+        "keepalive_expiry": limits.keepalive_expiry,
+        "timeout": timeout.read,
+        "connect_timeout": timeout.connect,
+        "started": _client is not None,
+    }
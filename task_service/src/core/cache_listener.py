@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from src.core.config import (
+    DATABASE_URL,
+    QUERY_CACHE_LISTEN_PING_SECONDS,
+    QUERY_CACHE_LISTEN_RETRY_SECONDS,
+)
+from src.core.query_cache import QueryCache, query_cache
+from src.db.session import ReplicaRouter, replica_router
+
+logger = logging.getLogger(__name__)
+
+
+def _asyncpg_dsn(url: str) -> str:
+    # asyncpg не понимает схему SQLAlchemy postgresql+asyncpg://
+    return (
+        make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+    )
+
+
+class CacheInvalidationListener:
+    """Одно долгоживущее LISTEN-соединение на воркер.
+
+    Уведомления о записях других воркеров поднимают локальные версии
+    query_cache и включают для автора чтение из основной БД. Пока соединения нет (старт, обрыв), кэш помечен
+    несогласованным и не используется; после переподключения работает
+    с чистого листа - уведомления за время обрыва потеряны.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        cache: QueryCache,
+        router: ReplicaRouter,
+        retry_seconds: float,
+        ping_seconds: float,
+    ):
+        self.dsn = dsn
+        self.cache = cache
+        self.router = router
+        self.retry_seconds = retry_seconds
+        self.ping_seconds = ping_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        author_id = self.cache.apply_notification(payload)
+        if author_id is not None:
+            self.router.mark_write(author_id)
+
+    async def _listen_once(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        try:
+            await connection.add_listener(
+                self.cache.notify_channel, self._on_notification
+            )
+            self.cache.set_coherent(True)
+            logger.info("listening on %s", self.cache.notify_channel)
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), self.ping_seconds)
+                except asyncio.TimeoutError:
+                    # обрыв TCP без FIN termination listener не заметит
+                    await connection.fetchval("SELECT 1", timeout=self.ping_seconds)
+        finally:
+            self.cache.set_coherent(False)
+            if not connection.is_closed():
+                await connection.close(timeout=self.ping_seconds)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("query cache listener failed")
+            await asyncio.sleep(self.retry_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+cache_listener: Optional[CacheInvalidationListener] = None
+if query_cache.notify_channel is not None and DATABASE_URL is not None:
+    cache_listener = CacheInvalidationListener(
+        _asyncpg_dsn(DATABASE_URL),
+        query_cache,
+        replica_router,
+        retry_seconds=QUERY_CACHE_LISTEN_RETRY_SECONDS,
+        ping_seconds=QUERY_CACHE_LISTEN_PING_SECONDS,
+    )
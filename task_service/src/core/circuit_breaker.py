@@ -0,0 +1,107 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class CircuitBreakerOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Размыкается после серии ошибок или медленных ответов и через
+    reset_timeout пропускает пробные запросы (half-open)."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        slow_call_seconds: float,
+        reset_timeout: float,
+        half_open_probes: int,
+    ):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _acquire(self) -> None:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.total_rejected += 1
+                raise CircuitBreakerOpen()
+            self.state = self.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if self.state == self.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.total_rejected += 1
+                raise CircuitBreakerOpen()
+            self._probes_in_flight += 1
+        self.total_calls += 1
+
+    def _release(self) -> None:
+        if self.state == self.HALF_OPEN and self._probes_in_flight > 0:
+            self._probes_in_flight -= 1
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def _on_failure(self) -> None:
+        self._release()
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _on_success(self, duration: float) -> None:
+        if duration >= self.slow_call_seconds:
+            self._on_failure()
+            return
+        self._release()
+        self.consecutive_failures = 0
+        if self.state == self.HALF_OPEN:
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self.state = self.CLOSED
+
+    @asynccontextmanager
+    async def call(self) -> AsyncIterator[None]:
+        self._acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            self._release()
+            raise
+        except BaseException:
+            self._on_failure()
+            raise
+        self._on_success(time.monotonic() - started)
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_calls": self.total_calls,
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected,
+            "failure_threshold": self.failure_threshold,
+            "slow_call_seconds": self.slow_call_seconds,
+            "reset_timeout": self.reset_timeout,
+        }
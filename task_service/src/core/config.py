@@ -4,4 +4,78 @@ import os
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# реплики только для чтения, через запятую; пусто - все запросы идут в DATABASE_URL
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+# 0 - без ограничения
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# 0 отключает prepared statements (нужно за pgbouncer в режиме transaction)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+# после записи чтения автора идут в основную БД, пока реплики не догонят
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+DB_READ_YOUR_WRITES_MAX_SIZE = int(os.getenv("DB_READ_YOUR_WRITES_MAX_SIZE", "100000"))
+# сколько не отправлять запросы в реплику, к которой не удалось подключиться
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
 AUTH_SERVICE_URL = os.getenv("AUTH_SERVICE_URL")
+
+# local - проверяем подпись токена сами, remote - спрашиваем auth_service (/auth/me)
+AUTH_VERIFY_MODE = os.getenv("AUTH_VERIFY_MODE", "local")
+AUTH_REMOTE_FALLBACK = os.getenv("AUTH_REMOTE_FALLBACK", "false").lower() == "true"
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+JWT_PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+
+AUTH_HTTP_MAX_CONNECTIONS = int(os.getenv("AUTH_HTTP_MAX_CONNECTIONS", "100"))
+AUTH_HTTP_MAX_KEEPALIVE = int(os.getenv("AUTH_HTTP_MAX_KEEPALIVE", "20"))
+AUTH_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("AUTH_HTTP_KEEPALIVE_EXPIRY", "30"))
+AUTH_HTTP_TIMEOUT = float(os.getenv("AUTH_HTTP_TIMEOUT", "5"))
+AUTH_HTTP_CONNECT_TIMEOUT = float(os.getenv("AUTH_HTTP_CONNECT_TIMEOUT", "2"))
+
+AUTH_BREAKER_FAILURE_THRESHOLD = int(os.getenv("AUTH_BREAKER_FAILURE_THRESHOLD", "5"))
+AUTH_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("AUTH_BREAKER_SLOW_CALL_SECONDS", "1"))
+AUTH_BREAKER_RESET_SECONDS = float(os.getenv("AUTH_BREAKER_RESET_SECONDS", "30"))
+AUTH_BREAKER_HALF_OPEN_PROBES = int(os.getenv("AUTH_BREAKER_HALF_OPEN_PROBES", "3"))
+
+# для RS256/ES256 без JWT_PUBLIC_KEY ключи берутся из JWKS auth_service
+JWKS_REFRESH_SECONDS = float(os.getenv("JWKS_REFRESH_SECONDS", "300"))
+
+SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", "10"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "100"))
+# порог pg_trgm для поиска с опечатками, когда полнотекстовый поиск ничего не нашёл
+SEARCH_TRGM_THRESHOLD = float(os.getenv("SEARCH_TRGM_THRESHOLD", "0.3"))
+
+TASK_BULK_MAX_ITEMS = int(os.getenv("TASK_BULK_MAX_ITEMS", "1000"))
+TASK_TAGS_MAX_TASKS = int(os.getenv("TASK_TAGS_MAX_TASKS", "10000"))
+# строк на одну выборку серверного курсора при выгрузке
+TASK_EXPORT_BATCH_SIZE = int(os.getenv("TASK_EXPORT_BATCH_SIZE", "1000"))
+# строк в одной пачке COPY при импорте и сколько ошибок строк вернуть в отчёте
+TASK_IMPORT_BATCH_SIZE = int(os.getenv("TASK_IMPORT_BATCH_SIZE", "5000"))
+TASK_IMPORT_MAX_ERRORS = int(os.getenv("TASK_IMPORT_MAX_ERRORS", "1000"))
+
+# кэш ответов чтения: memory - в процессе, redis - общий (нужен пакет redis), off
+QUERY_CACHE_BACKEND = os.getenv("QUERY_CACHE_BACKEND", "memory")
+QUERY_CACHE_URL = os.getenv("QUERY_CACHE_URL", "redis://localhost:6379/0")
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "30"))
+QUERY_CACHE_MAX_SIZE = int(os.getenv("QUERY_CACHE_MAX_SIZE", "10000"))
+QUERY_CACHE_MAX_ENTRY_BYTES = int(os.getenv("QUERY_CACHE_MAX_ENTRY_BYTES", "1048576"))
+# согласование memory-кэша между воркерами через Postgres LISTEN/NOTIFY
+QUERY_CACHE_NOTIFY = os.getenv("QUERY_CACHE_NOTIFY", "true").lower() == "true"
+QUERY_CACHE_NOTIFY_CHANNEL = os.getenv("QUERY_CACHE_NOTIFY_CHANNEL", "task_cache")
+QUERY_CACHE_LISTEN_RETRY_SECONDS = float(
+    os.getenv("QUERY_CACHE_LISTEN_RETRY_SECONDS", "5")
+)
+QUERY_CACHE_LISTEN_PING_SECONDS = float(
+    os.getenv("QUERY_CACHE_LISTEN_PING_SECONDS", "30")
+)
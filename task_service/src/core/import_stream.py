@@ -0,0 +1,99 @@
+import codecs
+import csv
+from typing import AsyncIterator, Tuple, Union
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson есть в requirements.txt
+    import json
+
+    _loads = json.loads
+
+
+class ImportFormatError(ValueError):
+    """Тело импорта нельзя разобрать целиком (кодировка, заголовок CSV)."""
+
+
+# номер строки данных и запись либо текст ошибки разбора этой строки
+ImportRecord = Tuple[int, Union[dict, str]]
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Строки тела запроса по мере поступления, с завершающим \\n."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    try:
+        async for chunk in chunks:
+            # делим только по \n: в JSON-строках могут быть U+2028 и т.п.
+            *lines, tail = (tail + decoder.decode(chunk)).split("\n")
+            for line in lines:
+                yield line + "\n"
+        tail += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as exc:
+        raise ImportFormatError(f"Body is not valid UTF-8: {exc}") from exc
+    if tail:
+        yield tail
+
+
+async def ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+    row = 0
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = _loads(line)
+        except ValueError as exc:
+            yield row, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield row, "Expected a JSON object"
+            continue
+        yield row, record
+
+
+async def _csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # запись CSV может занимать несколько строк, если в поле в кавычках есть
+    # перевод строки; запись закончена, когда число кавычек в ней чётное
+    record = ""
+    async for line in _lines(chunks):
+        record += line
+        if record.count('"') % 2 == 0:
+            yield record
+            record = ""
+    if record:
+        yield record
+
+
+async def csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+    """Записи CSV с заголовком; пустые значения считаются незаданными."""
+    columns = None
+    row = 0
+    async for text in _csv_records(chunks):
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as exc:
+            if columns is None:
+                raise ImportFormatError(f"Invalid CSV header: {exc}") from exc
+            row += 1
+            yield row, f"Invalid CSV: {exc}"
+            continue
+        if columns is None:
+            columns = [column.strip() for column in values]
+            if "title" not in columns:
+                raise ImportFormatError("CSV header must contain a title column")
+            continue
+        row += 1
+        if len(values) != len(columns):
+            yield row, f"Expected {len(columns)} values, got {len(values)}"
+            continue
+        yield row, {
+            column: value for column, value in zip(columns, values) if value != ""
+        }
+
+
+IMPORT_PARSERS = {"ndjson": ndjson_records, "csv": csv_records}
@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, and_, or_, tuple_
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(kind: str, value: Any, last_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([kind, value, last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _load_cursor(cursor: str) -> Tuple[str, Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        kind, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(kind), value, int(last_id)
+    except (ValueError, TypeError) as e:
+        raise CursorError("Invalid cursor") from e
+
+
+def peek_cursor_kind(cursor: str) -> str:
+    return _load_cursor(cursor)[0]
+
+
+def decode_cursor(cursor: str, kind: str) -> Tuple[Any, int]:
+    cursor_kind, value, last_id = _load_cursor(cursor)
+    if cursor_kind != kind:
+        raise CursorError("Cursor does not match query parameters")
+    return value, last_id
+
+
+def next_cursor(
+    items: Sequence[Any], limit: int, kind: str, sort_attr: str = "id"
+) -> Optional[str]:
+    if limit <= 0 or len(items) < limit:
+        return None
+    last = items[-1]
+    if isinstance(last, dict):
+        # задачи, выбранные с fields=..., приходят словарями
+        return encode_cursor(kind, last[sort_attr], last["id"])
+    return encode_cursor(kind, getattr(last, sort_attr), last.id)
+
+
+def keyset_order(column, id_column, descending: bool) -> tuple:
+    if descending:
+        return column.desc(), id_column.desc()
+    return column.asc(), id_column.asc()
+
+
+def keyset_filter(column, id_column, descending: bool, value: Any, last_id: int):
+    """Условие «строго после (value, last_id)» для keyset_order.
+
+    NULL-ы считаются больше любых значений, как в Postgres по умолчанию:
+    при ASC они в конце, при DESC - в начале.
+    """
+    if value is not None and isinstance(column.type, DateTime):
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError) as e:
+            raise CursorError("Invalid cursor") from e
+
+    if id_column is column:
+        return id_column < last_id if descending else id_column > last_id
+
+    if value is None:
+        if descending:
+            return or_(and_(column.is_(None), id_column < last_id), column.isnot(None))
+        return and_(column.is_(None), id_column > last_id)
+
+    key, bound = tuple_(column, id_column), tuple_(value, last_id)
+    if descending:
+        # column <= value дублирует сравнение строк, чтобы планировщик взял индекс
+        return and_(column <= value, key < bound)
+    return or_(and_(column >= value, key > bound), column.is_(None))
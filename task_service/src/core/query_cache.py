@@ -0,0 +1,364 @@
+import hashlib
+import json
+import logging
+import os
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import func, select
+
+from src.core.cache import TTLCache
+from src.core.config import (
+    QUERY_CACHE_BACKEND,
+    QUERY_CACHE_MAX_ENTRY_BYTES,
+    QUERY_CACHE_MAX_SIZE,
+    QUERY_CACHE_NOTIFY,
+    QUERY_CACHE_NOTIFY_CHANNEL,
+    QUERY_CACHE_TTL_SECONDS,
+    QUERY_CACHE_URL,
+)
+from src.core.serialization import dumps, json_body_response
+from src.db.session import replica_router
+
+logger = logging.getLogger(__name__)
+
+
+def _next_version(current: Optional[int]) -> int:
+    # версия растёт монотонно и не ниже time_ns: если счётчик потерян
+    # (рестарт, вытеснение), новые версии не совпадут со старыми ключами
+    return max((current or 0) + 1, time.time_ns())
+
+
+class MemoryBackend:
+    """Кэш в памяти процесса: LRU + TTL, у каждого воркера свой."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.values = TTLCache(maxsize=maxsize, ttl=ttl)
+        # версия нужна, пока живут записи под ней; вытесненную безопасно
+        # создать заново - _next_version не даст ей совпасть со старой
+        self.versions = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.values.set(key, value, ttl)
+
+    async def get_version(self, author_id: int) -> int:
+        version = self.versions.get(author_id)
+        if version is None:
+            version = _next_version(None)
+        # срок продлеваем при каждом чтении: пока автора читают, записи
+        # в кэше под этой версией остаются достижимыми
+        self.versions.set(author_id, version)
+        return version
+
+    async def bump_version(self, author_id: int) -> int:
+        version = _next_version(self.versions.get(author_id))
+        self.versions.set(author_id, version)
+        return version
+
+    def apply_version(self, author_id: int, version: int) -> None:
+        # версия из уведомления другого воркера; поднимаем и свою, даже если
+        # она уже больше: запись в кэш могла сняться до коммита чужой записи
+        current = self.versions.get(author_id) or 0
+        self.versions.set(author_id, max(current + 1, version))
+
+    def reset(self) -> None:
+        self.versions.clear()
+        self.values.clear()
+
+    def size(self) -> int:
+        return len(self.values)
+
+    async def close(self) -> None:
+        self.values.clear()
+
+
+class RedisBackend:
+    """Кэш в Redis или любом сервере с его протоколом (нужен пакет redis).
+
+    Используются только GET, SET (EX/NX) и WATCH/MULTI, без Lua-скриптов.
+    """
+
+    name = "redis"
+    prefix = "taskcache"
+
+    def __init__(self, url: str, ttl: float):
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as exc:
+            raise RuntimeError(
+                "QUERY_CACHE_BACKEND=redis requires the 'redis' package"
+            ) from exc
+        self.client = aioredis.from_url(url)
+        self.ttl = ttl
+
+    def _version_key(self, author_id: int) -> str:
+        return f"{self.prefix}:v:{author_id}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(f"{self.prefix}:{key}")
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(f"{self.prefix}:{key}", value, ex=max(int(ttl), 1))
+
+    async def get_version(self, author_id: int) -> int:
+        key = self._version_key(author_id)
+        version = await self.client.get(key)
+        if version is None:
+            await self.client.set(key, _next_version(None), nx=True)
+            version = await self.client.get(key)
+        return int(version)
+
+    async def bump_version(self, author_id: int) -> int:
+        key = self._version_key(author_id)
+
+        async def bump(pipe) -> int:
+            version = _next_version(int(await pipe.get(key) or 0))
+            pipe.multi()
+            pipe.set(key, version)
+            return version
+
+        # не INCR: версия, как и у MemoryBackend, не ниже time_ns записи -
+        # по ней ReplicaRouter видит недавние записи из других воркеров
+        return await self.client.transaction(bump, key, value_from_callable=True)
+
+    def size(self) -> Optional[int]:
+        return None
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class QueryCache:
+    """Кэш ответов чтения, привязанный к версии данных автора.
+
+    Ключ содержит текущую версию автора, поэтому любая запись, поднявшая
+    версию, делает все его прежние записи недостижимыми - удалять их не нужно,
+    они уйдут по LRU/TTL. Ошибки бэкенда не ломают запрос: читаем из БД.
+
+    С notify_channel версии в памяти воркера согласуются через Postgres
+    NOTIFY (см. core/cache_listener.py); пока LISTEN-соединения нет,
+    кэш не используется (coherent=False).
+    """
+
+    def __init__(
+        self,
+        backend,
+        ttl: float,
+        max_entry_bytes: int,
+        notify_channel: Optional[str] = None,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.notify_channel = notify_channel
+        self.worker_id = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self.coherent = notify_channel is None
+        self.remote_invalidations = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidations = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def params_digest(name: str, params: dict) -> str:
+        normalized = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha1(f"{name}:{normalized}".encode()).hexdigest()
+
+    @classmethod
+    def make_key(cls, author_id: int, version: int, name: str, params: dict) -> str:
+        return f"{author_id}:{version}:{name}:{cls.params_digest(name, params)}"
+
+    async def version(self, author_id: int) -> Optional[int]:
+        """Текущая версия данных автора; None, если кэш выключен или недоступен."""
+        if self.backend is None or not self.coherent:
+            return None
+        try:
+            return await self.backend.get_version(author_id)
+        except Exception:
+            logger.exception("query cache version read failed")
+            self.errors += 1
+            return None
+
+    async def get_or_load(
+        self,
+        author_id: int,
+        name: str,
+        params: dict,
+        load: Callable[[], Awaitable[Any]],
+        version: Optional[int] = None,
+    ) -> bytes:
+        """Возвращает JSON ответа из кэша или из load() с сохранением в кэш."""
+        if version is None:
+            version = await self.version(author_id)
+        if version is None:
+            return dumps(await load())
+        key = self.make_key(author_id, version, name, params)
+        try:
+            body = await self.backend.get(key)
+        except Exception:
+            logger.exception("query cache read failed")
+            self.errors += 1
+            return dumps(await load())
+        if body is not None:
+            self.hits += 1
+            return body
+
+        self.misses += 1
+        body = dumps(await load())
+        if len(body) <= self.max_entry_bytes:
+            try:
+                await self.backend.set(key, body, self.ttl)
+            except Exception:
+                logger.exception("query cache write failed")
+                self.errors += 1
+        return body
+
+    async def invalidate(self, author_id: int) -> None:
+        if self.backend is None:
+            return
+        try:
+            await self.backend.bump_version(author_id)
+            self.invalidations += 1
+        except Exception:
+            logger.exception("query cache invalidation failed")
+            self.errors += 1
+
+    async def publish(self, session, author_id: int, entity: str) -> None:
+        """NOTIFY об изменении данных автора в транзакции записи.
+
+        Postgres доставит уведомление только после коммита и только если
+        он удался, поэтому другие воркеры не сбросят кэш зря.
+        """
+        if self.notify_channel is None:
+            return
+        payload = dumps(
+            {"w": self.worker_id, "a": author_id, "e": entity, "v": _next_version(None)}
+        ).decode()
+        await session.execute(select(func.pg_notify(self.notify_channel, payload)))
+
+    def apply_notification(self, payload: str) -> Optional[int]:
+        """Применяет уведомление другого воркера к локальным версиям.
+
+        Возвращает author_id из уведомления или None, если оно своё или битое.
+        """
+        try:
+            message = json.loads(payload)
+            if message["w"] == self.worker_id:
+                return None
+            author_id = int(message["a"])
+            self.backend.apply_version(author_id, int(message["v"]))
+        except Exception:
+            logger.exception("bad query cache notification: %r", payload)
+            self.errors += 1
+            return None
+        self.remote_invalidations += 1
+        return author_id
+
+    def set_coherent(self, coherent: bool) -> None:
+        # пока уведомления не доходят, чужие записи не видны - всё сбрасываем
+        if not coherent and self.backend is not None:
+            self.backend.reset()
+        self.coherent = coherent
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend else "off",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "errors": self.errors,
+            "invalidations": self.invalidations,
+            "remote_invalidations": self.remote_invalidations,
+            "coherent": self.coherent,
+            "not_modified": self.not_modified,
+            "size": self.backend.size() if self.backend else 0,
+        }
+
+
+def _make_backend():
+    if QUERY_CACHE_BACKEND == "memory":
+        return MemoryBackend(maxsize=QUERY_CACHE_MAX_SIZE, ttl=QUERY_CACHE_TTL_SECONDS)
+    if QUERY_CACHE_BACKEND == "redis":
+        return RedisBackend(QUERY_CACHE_URL, ttl=QUERY_CACHE_TTL_SECONDS)
+    return None
+
+
+query_cache = QueryCache(
+    _make_backend(),
+    ttl=QUERY_CACHE_TTL_SECONDS,
+    max_entry_bytes=QUERY_CACHE_MAX_ENTRY_BYTES,
+    # у redis версии общие, уведомлять другие воркеры нужно только для memory
+    notify_channel=(
+        QUERY_CACHE_NOTIFY_CHANNEL
+        if QUERY_CACHE_NOTIFY and QUERY_CACHE_BACKEND == "memory"
+        else None
+    ),
+)
+
+
+async def commit_and_invalidate(session, author_id: int, entity: str = "task") -> None:
+    """Коммит записи и сброс кэша чтения автора - именно в таком порядке."""
+    await query_cache.publish(session, author_id, entity)
+    await session.commit()
+    replica_router.mark_write(author_id)
+    await query_cache.invalidate(author_id)
+
+
+_MISSING = object()
+
+
+def _etag(version: int, name: str, params: dict) -> str:
+    return f'W/"{version:x}-{QueryCache.params_digest(name, params)[:16]}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # для If-None-Match сравнение слабое: префикс W/ не учитывается
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+async def cached_json_response(
+    request: Request,
+    author_id: int,
+    name: str,
+    params: dict,
+    load: Callable[[], Awaitable[Any]],
+    status_code: int = 200,
+    etag: bool = True,
+) -> Response:
+    """Ответ списка через query_cache с ETag из версии данных автора.
+
+    Если у клиента актуальная версия, отвечаем 304 ещё до запроса в БД
+    и сериализации. Версию, уже прочитанную get_read_session для выбора
+    реплики, берём из request.state.
+    """
+    version = getattr(request.state, "query_cache_version", _MISSING)
+    if version is _MISSING:
+        version = await query_cache.version(author_id)
+    headers = {}
+    if etag and version is not None:
+        headers["ETag"] = _etag(version, name, params)
+        headers["Cache-Control"] = "private, no-cache"
+        if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            query_cache.not_modified += 1
+            return Response(status_code=304, headers=headers)
+    body = await query_cache.get_or_load(author_id, name, params, load, version)
+    return json_body_response(body, status_code=status_code, headers=headers)
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from httpx import HTTPError
+from jose import JWTError, jwt
+
+from src.core.auth_client import get_auth_client
+from src.core.config import (
+    AUTH_SERVICE_URL,
+    AUTH_VERIFY_MODE,
+    JWKS_REFRESH_SECONDS,
+    JWT_ALGORITHM,
+    JWT_PUBLIC_KEY,
+    JWT_SECRET_KEY,
+)
+
+JWKS_PATH = "/auth/.well-known/jwks.json"
+
+if AUTH_VERIFY_MODE == "local":
+    if JWT_ALGORITHM.startswith("HS"):
+        assert JWT_SECRET_KEY is not None, "JWT_SECRET_KEY is not set"
+    else:
+        assert (
+            JWT_PUBLIC_KEY is not None or AUTH_SERVICE_URL is not None
+        ), "JWT_PUBLIC_KEY or AUTH_SERVICE_URL (for JWKS) is not set"
+
+
+class JWKSKeySet:
+    """Публичные ключи auth_service по kid. Обновляются раз в refresh_seconds
+    и сразу, если пришёл токен с неизвестным kid (не чаще min_interval)."""
+
+    def __init__(self, refresh_seconds: float, min_interval: float = 10):
+        self.refresh_seconds = refresh_seconds
+        self.min_interval = min_interval
+        self._keys: Dict[str, dict] = {}
+        self._fetched_at = 0.0
+        self._attempted_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _refresh(self) -> None:
+        self._attempted_at = time.monotonic()
+        client = await get_auth_client()
+        try:
+            response = await client.get(JWKS_PATH)
+            response.raise_for_status()
+        except HTTPError:
+            # оставляем прежний набор ключей до следующей попытки
+            return
+        self._keys = {key["kid"]: key for key in response.json().get("keys", [])}
+        self._fetched_at = time.monotonic()
+
+    def _needs_refresh(self, kid: str) -> bool:
+        now = time.monotonic()
+        if now - self._attempted_at < self.min_interval:
+            return False
+        return kid not in self._keys or now - self._fetched_at >= self.refresh_seconds
+
+    async def get(self, kid: str) -> Optional[dict]:
+        if self._needs_refresh(kid):
+            async with self._lock:
+                if self._needs_refresh(kid):
+                    await self._refresh()
+        return self._keys.get(kid)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+jwks = JWKSKeySet(refresh_seconds=JWKS_REFRESH_SECONDS)
+
+
+async def _verification_key(token: str):
+    if JWT_ALGORITHM.startswith("HS"):
+        return JWT_SECRET_KEY
+    if JWT_PUBLIC_KEY is not None:
+        return JWT_PUBLIC_KEY
+    kid = jwt.get_unverified_header(token).get("kid")
+    return await jwks.get(kid) if kid else None
+
+
+async def decode_access_token(token: str) -> Optional[dict]:
+    try:
+        key = await _verification_key(token)
+        if key is None:
+            return None
+        return jwt.decode(token, key, algorithms=[JWT_ALGORITHM])
+    except JWTError:
+        return None
+
+
+def user_from_claims(claims: dict) -> Optional[dict]:
+    """Собирает текущего пользователя в том же виде, что отдаёт /auth/me."""
+    user_id = claims.get("id")
+    email = claims.get("sub")
+    if user_id is None or email is None:
+        return None
+    return {"id": int(user_id), "email": email, "username": claims.get("username")}
@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson есть в requirements.txt
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # как у Pydantic: UTC пишется как Z
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON побайтно такой же, как у FastAPI после валидации через response_model."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Ответ для уже готовых словарей: без response_model и jsonable_encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def normalize_tags(tasks: List[dict]) -> dict:
+    """Выносит теги задач в общий словарь {id: тег}, оставляя у задач tag_ids."""
+    tags: dict = {}
+    for task in tasks:
+        task_tags = task.pop("tags", [])
+        task["tag_ids"] = [tag["id"] for tag in task_tags]
+        for tag in task_tags:
+            # ключи JSON-объекта - строки
+            tags.setdefault(str(tag["id"]), tag)
+    return tags
+
+
+def task_list_content(
+    tasks: List[dict],
+    shape: str = "embedded",
+    paginated: bool = False,
+    next_cursor: Optional[str] = None,
+) -> Any:
+    """Тело списка задач: список, {items, next_cursor} или normalized-форма."""
+    if shape == "normalized":
+        content: Any = {"items": tasks, "tags": normalize_tags(tasks)}
+        if paginated:
+            content["next_cursor"] = next_cursor
+        return content
+    if paginated:
+        return {"items": tasks, "next_cursor": next_cursor}
+    return tasks
+
+
+def task_list_response(
+    tasks: List[dict],
+    shape: str = "embedded",
+    paginated: bool = False,
+    next_cursor: Optional[str] = None,
+) -> FastJSONResponse:
+    return FastJSONResponse(task_list_content(tasks, shape, paginated, next_cursor))
+
+
+def json_body_response(
+    body: bytes, status_code: int = 200, headers: Optional[dict] = None
+) -> Response:
+    """Ответ из уже готового JSON (например, из кэша)."""
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def ndjson_lines(items: List[dict]) -> bytes:
+    """Пачка объектов в NDJSON: по одному JSON на строку."""
+    return b"".join(dumps(item) + b"\n" for item in items)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime, list, dict)):
+        # даты в том же виде, что и в JSON-ответах, списки - JSON-массивом
+        text = dumps(value).decode()
+        return text[1:-1] if isinstance(value, datetime) else text
+    return value
+
+
+def csv_lines(items: List[dict], columns: Sequence[str], header: bool = False) -> str:
+    """Пачка объектов в строки CSV (RFC 4180) с колонками columns."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_csv_value(item[column]) for column in columns] for item in items)
+    return buffer.getvalue()
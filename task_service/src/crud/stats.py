@@ -0,0 +1,48 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.stats import PRIORITIES, TagStats, TaskStats
+from src.models.tag import Tag
+from src.models.task import Task
+
+
+async def get_task_stats(session: AsyncSession, author_id: int) -> dict:
+    """Счётчики автора из task_stats/tag_stats без сканирования tasks.
+
+    Просроченные задачи зависят от текущего времени, их счётчиком не ведут:
+    они считаются по частичному индексу открытых задач с дедлайном.
+    """
+    stats = await session.get(TaskStats, author_id)
+    overdue = await session.execute(
+        select(func.count())
+        .select_from(Task)
+        .where(
+            Task.author_id == author_id,
+            Task.deadline < datetime.now(UTC),
+            Task.is_completed == False,
+        )
+    )
+    tags = await session.execute(
+        select(Tag.id, Tag.name, func.coalesce(TagStats.task_count, 0))
+        .outerjoin(TagStats, TagStats.tag_id == Tag.id)
+        .where(Tag.author_id == author_id)
+        .order_by(Tag.id)
+    )
+    total = stats.total if stats else 0
+    completed = stats.completed if stats else 0
+    return {
+        "total": total,
+        "completed": completed,
+        "open": total - completed,
+        "overdue": overdue.scalar_one(),
+        "by_priority": {
+            str(priority): getattr(stats, f"priority_{priority}") if stats else 0
+            for priority in PRIORITIES
+        },
+        "tags": [
+            {"id": tag_id, "name": name, "task_count": task_count}
+            for tag_id, name, task_count in tags.all()
+        ],
+    }
@@ -1,31 +1,85 @@
-from typing import Optional, Sequence
+from typing import List, Optional, Sequence
 from fastapi import HTTPException
-from sqlalchemy import and_
+from sqlalchemy import and_, delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from src.core.pagination import decode_cursor, keyset_filter
+from src.core.query_cache import commit_and_invalidate
+from src.crud.task_fields import load_tasks, select_tasks
 from src.models.task import Task
 from src.models.tag import Tag
 from src.models.task_tag import task_tag_table
 
 
+TAG_EXISTS_DETAIL = "Tag with this name already exists"
+
+
 async def create_tag_db(session: AsyncSession, name: str, author_id: int) -> Tag:
-    tag = Tag(name=name, author_id=author_id)
-    session.add(tag)
-    await session.commit()
-    await session.refresh(tag)
+    result = await session.execute(
+        pg_insert(Tag)
+        .values(name=name, author_id=author_id)
+        .on_conflict_do_nothing(index_elements=[Tag.author_id, Tag.name])
+        .returning(Tag)
+    )
+    tag = result.scalars().first()
+    await commit_and_invalidate(session, author_id, "tag")
+    if tag is None:
+        raise HTTPException(status_code=409, detail=TAG_EXISTS_DETAIL)
     return tag
 
 
+async def get_or_create_tags(
+    session: AsyncSession, author_id: int, names: List[str]
+) -> List[Tag]:
+    """Находит или создаёт теги по именам одним INSERT ... ON CONFLICT ... RETURNING.
+
+    DO UPDATE (а не DO NOTHING) нужен, чтобы RETURNING вернул и уже
+    существующие теги. Коммит остаётся на вызывающем.
+    """
+    # один INSERT не может задеть одну строку дважды, поэтому убираем повторы
+    names = list(dict.fromkeys(names))
+    if not names:
+        return []
+    insert_stmt = pg_insert(Tag).values(
+        [{"name": name, "author_id": author_id} for name in names]
+    )
+    result = await session.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[Tag.author_id, Tag.name],
+            set_={"name": insert_stmt.excluded.name},
+        )
+        .returning(Tag)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
+
+
+TAG_LIST_CURSOR_KIND = "tags"
+
+
+def tag_tasks_cursor_kind(tag_id: int) -> str:
+    return f"tag:{tag_id}:tasks"
+
+
 async def get_all_tags_by_author_id(
     session: AsyncSession,
     author_id: int,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Sequence[Tag]:
-    result = await session.execute(
-        select(Tag).filter(Tag.author_id == author_id).offset(skip).limit(limit)
-    )
+    query = select(Tag).filter(Tag.author_id == author_id)
+    if cursor is None:
+        query = query.offset(skip)
+    else:
+        query = query.order_by(Tag.id)
+        if cursor:
+            _, last_id = decode_cursor(cursor, TAG_LIST_CURSOR_KIND)
+            query = query.where(keyset_filter(Tag.id, Tag.id, False, last_id, last_id))
+    result = await session.execute(query.limit(limit))
     return result.scalars().all()
 
 
@@ -41,21 +95,33 @@ async def get_tag_by_id(
 async def update_tag_by_id(
     session: AsyncSession, tag_id: int, author_id: int, new_name: str
 ) -> Optional[Tag]:
-    tag = await get_tag_by_id(session, tag_id, author_id)
-    if tag:
-        tag.name = new_name  # type: ignore
-        await session.commit()
-        await session.refresh(tag)
+    try:
+        result = await session.execute(
+            update(Tag)
+            .where(Tag.id == tag_id, Tag.author_id == author_id)
+            .values(name=new_name)
+            .returning(Tag)
+            .execution_options(populate_existing=True)
+        )
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail=TAG_EXISTS_DETAIL)
+    tag = result.scalars().first()
+    await commit_and_invalidate(session, author_id, "tag")
     return tag
 
 
 async def delete_tag_by_id(session: AsyncSession, tag_id: int, author_id: int) -> bool:
-    tag = await get_tag_by_id(session, tag_id, author_id)
-    if tag:
-        await session.delete(tag)
-        await session.commit()
-        return True
-    return False
+    # связи в task_tag удаляет ON DELETE CASCADE
+    result = await session.execute(
+        delete(Tag)
+        .where(Tag.id == tag_id, Tag.author_id == author_id)
+        .returning(Tag.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = result.first() is not None
+    await commit_and_invalidate(session, author_id, "tag")
+    return deleted
 
 
 async def search_tags_by_name(
@@ -76,17 +142,28 @@ async def get_tasks_for_tag(
     is_completed: bool | None = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
 ) -> Sequence[Task]:
     tag = await get_tag_by_id(session, tag_id, author_id)
     if not tag:
         return []
     query = (
-        select(Task)
+        select_tasks(fields)
         .join(task_tag_table, Task.id == task_tag_table.c.task_id)
         .where(task_tag_table.c.tag_id == tag_id)
     )
     if is_completed is not None:
         query = query.where(Task.is_completed == is_completed)
 
-    tasks = await session.execute(query.offset(skip).limit(limit))
-    return tasks.scalars().all()
+    if cursor is None:
+        query = query.offset(skip)
+    else:
+        query = query.order_by(Task.id)
+        if cursor:
+            _, last_id = decode_cursor(cursor, tag_tasks_cursor_kind(tag_id))
+            query = query.where(
+                keyset_filter(Task.id, Task.id, False, last_id, last_id)
+            )
+
+    return await load_tasks(session, query.limit(limit), fields)
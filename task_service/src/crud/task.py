@@ -1,12 +1,56 @@
+import hashlib
+import re
 from datetime import UTC, date, datetime, timedelta
-from typing import List, Optional, Sequence
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 from fastapi import HTTPException
-from sqlalchemy import and_, asc, desc, or_
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Integer,
+    String,
+    all_,
+    and_,
+    any_,
+    asc,
+    bindparam,
+    column,
+    delete,
+    desc,
+    func,
+    insert,
+    literal_column,
+    or_,
+    tuple_,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSON, aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
 from sqlalchemy.future import select
 
+from src.core.config import SEARCH_TRGM_THRESHOLD
+from src.core.query_cache import commit_and_invalidate
+from src.crud.tag import get_or_create_tags
+from src.crud.task_fields import (
+    TAGS_FIELD,
+    TASK_FIELDS,
+    attach_tags,
+    load_tasks,
+    rows_to_tasks,
+    select_tasks,
+)
+from src.core.pagination import (
+    CursorError,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    keyset_order,
+    peek_cursor_kind,
+)
 from src.models.tag import Tag
-from src.schemas.task import TaskCreate, TaskUpdate
+from src.schemas.task import TaskBulkUpdate, TaskCreate, TaskFilter, TaskUpdate
 from src.models.task import Task
 from src.models.task_tag import task_tag_table
 
@@ -14,20 +58,60 @@ from src.models.task_tag import task_tag_table
 async def create_task_db(
     session: AsyncSession, task_data: TaskCreate, author_id: int
 ) -> Task:
-    task_dict = task_data.model_dump()
+    result = await session.execute(
+        insert(Task)
+        .values(
+            title=task_data.title,
+            description=task_data.description,
+            priority=task_data.priority,
+            deadline=_as_utc(task_data.deadline),
+            author_id=author_id,
+        )
+        .returning(Task)
+        .options(noload(Task.tags))
+    )
+    task = result.scalars().one()
+    tag_ids = [tag.id for tag in task_data.tags]
+    if task_data.tag_names:
+        tag_ids += (
+            await _tag_ids_by_name(session, author_id, task_data.tag_names)
+        ).values()
+    await _link_tags(session, author_id, *_all_pairs([task.id], tag_ids))
+    await commit_and_invalidate(session, author_id)
+    await attach_tags(session, [task])
+    return task
 
-    if task_dict.get("deadline"):
-        deadline = task_dict["deadline"]
-        if deadline.tzinfo is not None:
-            task_dict["deadline"] = deadline.astimezone(UTC)
-        else:
-            task_dict["deadline"] = deadline.replace(tzinfo=UTC)
 
-    task = Task(**task_data.model_dump(), author_id=author_id)
-    session.add(task)
-    await session.commit()
-    await session.refresh(task)
-    return task
+async def _tag_ids_by_name(
+    session: AsyncSession, author_id: int, names: List[str]
+) -> dict:
+    tags = await get_or_create_tags(session, author_id, names)
+    return {tag.name: tag.id for tag in tags}
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        return value.astimezone(UTC)
+    return value.replace(tzinfo=UTC)
+
+
+def _array(name: str, values: list, item_type):
+    return bindparam(name, values, type_=ARRAY(item_type))
+
+
+TASK_SORT_COLUMNS = {
+    "title": Task.title,
+    "priority": Task.priority,
+    "deadline": Task.deadline,
+    "created_at": Task.created_at,
+}
+OVERDUE_CURSOR_KIND = "overdue"
+
+
+def task_list_cursor_kind(sort_by: str, order: str) -> str:
+    return f"tasks:{sort_by}:{order}"
 
 
 async def get_all_tasks_by_author_id(
@@ -38,29 +122,117 @@ async def get_all_tasks_by_author_id(
     is_completed: bool | None = None,
     sort_by: str = "created_at",
     order: str = "desc",
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
 ) -> Sequence[Task]:
-    sort_column = {
-        "title": Task.title,
-        "priority": Task.priority,
-        "deadline": Task.deadline,
-        "created_at": Task.created_at,
-    }.get(sort_by, Task.created_at)
+    if sort_by not in TASK_SORT_COLUMNS:
+        sort_by = "created_at"
+    sort_column = TASK_SORT_COLUMNS[sort_by]
     sort_order = desc if order == "desc" else asc
 
-    query = select(Task).where(Task.author_id == author_id)
+    # поле сортировки нужно курсору, поэтому в режиме курсора выбираем его всегда
+    query = select_tasks(fields, *([sort_by] if cursor is not None else []))
+    query = query.where(Task.author_id == author_id)
     if is_completed is not None:
         query = query.where(Task.is_completed == is_completed)
-    query = query.order_by(sort_order(sort_column)).offset(skip).limit(limit)
 
-    result = await session.execute(query)
-    return result.scalars().all()
+    if cursor is None:
+        query = query.order_by(sort_order(sort_column)).offset(skip)
+    else:
+        # keyset: пустой курсор - первая страница, дальше продолжаем после (значение, id)
+        descending = order == "desc"
+        query = query.order_by(*keyset_order(sort_column, Task.id, descending))
+        if cursor:
+            value, last_id = decode_cursor(
+                cursor, task_list_cursor_kind(sort_by, order)
+            )
+            query = query.where(
+                keyset_filter(sort_column, Task.id, descending, value, last_id)
+            )
+
+    return await load_tasks(session, query.limit(limit), fields)
+
+
+def _tags_json_subquery():
+    """Теги задачи одним JSON-массивом, агрегированным в SQL."""
+    tag = func.json_build_object(
+        "id", Tag.id, "name", Tag.name, "author_id", Tag.author_id
+    )
+    return (
+        select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(tag, Tag.id)),
+                literal_column("'[]'::json"),
+            )
+        )
+        .select_from(task_tag_table.join(Tag, Tag.id == task_tag_table.c.tag_id))
+        .where(task_tag_table.c.task_id == Task.id)
+        .scalar_subquery()
+    )
+
+
+async def stream_tasks_for_export(
+    session: AsyncSession,
+    author_id: int,
+    is_completed: Optional[bool] = None,
+    sort_by: str = "created_at",
+    order: str = "desc",
+    batch_size: int = 1000,
+) -> AsyncIterator[List[dict]]:
+    """Все задачи автора пачками по batch_size через серверный курсор.
+
+    Задачи приходят словарями с полями TaskResponse, теги - списком словарей
+    из json_agg, без ORM и selectinload, поэтому память не растёт с размером
+    выгрузки.
+    """
+    sort_column = TASK_SORT_COLUMNS.get(sort_by, Task.created_at)
+    query = (
+        select(
+            *(getattr(Task, name) for name in TASK_FIELDS),
+            type_coerce(_tags_json_subquery(), JSON).label(TAGS_FIELD),
+        )
+        .where(Task.author_id == author_id)
+        .order_by(*keyset_order(sort_column, Task.id, order == "desc"))
+        .execution_options(yield_per=batch_size)
+    )
+    if is_completed is not None:
+        query = query.where(Task.is_completed == is_completed)
+
+    result = await session.stream(query)
+    async for rows in result.mappings().partitions():
+        yield [dict(row) for row in rows]
 
 
 async def get_task_by_id(
     session: AsyncSession, task_id: int, author_id: int
 ) -> Optional[Task]:
     result = await session.execute(
-        select(Task).filter(Task.id == task_id, Task.author_id == author_id)
+        select_tasks().filter(Task.id == task_id, Task.author_id == author_id)
+    )
+    return result.scalars().first()
+
+
+def _update_values(task_data: TaskUpdate) -> dict:
+    # None означает «не менять поле», поэтому такие поля в SET не попадают
+    values = task_data.model_dump(
+        exclude_none=True, exclude={"id", "tag_ids", "tag_names"}
+    )
+    if "deadline" in values:
+        values["deadline"] = _as_utc(values["deadline"])
+    return values
+
+
+async def _update_task_returning(
+    session: AsyncSession, task_id: int, author_id: int, values: dict, *where
+) -> Optional[Task]:
+    """Один UPDATE ... RETURNING по id и автору; None, если строка не нашлась."""
+    result = await session.execute(
+        update(Task)
+        .where(Task.id == task_id, Task.author_id == author_id, *where)
+        .values(**values)
+        .returning(Task)
+        .options(noload(Task.tags))
+        .execution_options(populate_existing=True)
     )
     return result.scalars().first()
 
@@ -68,114 +240,216 @@ async def get_task_by_id(
 async def update_task_by_id(
     session: AsyncSession, task_id: int, author_id: int, task_data: TaskUpdate
 ) -> Optional[Task]:
-    task = await get_task_by_id(session, task_id, author_id)
-    if task:
-        if task_data.title is not None:
-            task.title = task_data.title  # type: ignore
-        if task_data.description is not None:
-            task.description = task_data.description  # type: ignore
-        if task_data.priority is not None:
-            task.priority = task_data.priority  # type: ignore
-        if task_data.is_completed is not None:
-            task.is_completed = task_data.is_completed  # type: ignore
-        if task_data.deadline is not None:
-            deadline = task_data.deadline
-            if deadline.tzinfo is not None:
-                task.deadline = deadline.astimezone(UTC)  # type: ignore
-            else:
-                task.deadline = deadline.replace(tzinfo=UTC)  # type: ignore
-        if task_data.tag_ids is not None:
-            result = await session.execute(
-                select(Tag).where(
-                    and_(Tag.id.in_(task_data.tag_ids), Tag.author_id == author_id)
-                )
-            )
-            valid_tags = result.scalars().all()
-            task.tags.clear()
-            task.tags.extend(valid_tags)
-
-    await session.commit()
-    await session.refresh(task)
+    values = _update_values(task_data)
+    if values:
+        task = await _update_task_returning(session, task_id, author_id, values)
+    else:
+        result = await session.execute(
+            select(Task)
+            .where(Task.id == task_id, Task.author_id == author_id)
+            .options(noload(Task.tags))
+        )
+        task = result.scalars().first()
+    if task is None:
+        return None
+
+    if task_data.replaces_tags:
+        tag_ids = list(task_data.tag_ids or [])
+        if task_data.tag_names:
+            tag_ids += (
+                await _tag_ids_by_name(session, author_id, task_data.tag_names)
+            ).values()
+        await _change_tags(session, author_id, [task_id], tag_ids, "replace")
+    await commit_and_invalidate(session, author_id)
+    await attach_tags(session, [task])
     return task
 
 
 async def delete_task_by_id(
     session: AsyncSession, task_id: int, author_id: int
 ) -> bool:
-    task = await get_task_by_id(session, task_id, author_id)
-    if task:
-        await session.delete(task)
-        await session.commit()
-        return True
-    return False
+    # связи в task_tag удаляет ON DELETE CASCADE
+    result = await session.execute(
+        delete(Task)
+        .where(Task.id == task_id, Task.author_id == author_id)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = result.first() is not None
+    await commit_and_invalidate(session, author_id)
+    return deleted
 
 
 async def mark_task_complete_by_id(
     session: AsyncSession, task_id: int, author_id: int
 ) -> Optional[Task]:
-    task = await get_task_by_id(session, task_id, author_id)
-    if task:
-        task.is_completed = True  # type: ignore
-        await session.commit()
-        await session.refresh(task)
+    task = await _update_task_returning(
+        session, task_id, author_id, {"is_completed": True}
+    )
+    await commit_and_invalidate(session, author_id)
+    if task is not None:
+        await attach_tags(session, [task])
     return task
 
 
 async def get_task_tags_by_id(
     session: AsyncSession, task_id: int, author_id: int
 ) -> Sequence[Tag]:
-    task = await get_task_by_id(session, task_id, author_id)
-    if not task:
-        return []
-    return task.tags
-
-
-async def search_tasks_by_title(
-    session: AsyncSession, title: str, author_id: int
-) -> Sequence[Task]:
     result = await session.execute(
-        select(Task)
-        .where(and_(Task.author_id == author_id), Task.title.ilike(f"%{title}%"))
-        .limit(10)
+        select(Tag)
+        .join(task_tag_table, Tag.id == task_tag_table.c.tag_id)
+        .join(Task, Task.id == task_tag_table.c.task_id)
+        .where(Task.id == task_id, Task.author_id == author_id)
+        .order_by(Tag.id)
     )
     return result.scalars().all()
 
 
-async def update_tags_task_by_id(
-    session: AsyncSession, task_id: int, author_id: int, tag_ids: List[int]
-) -> Optional[Task]:
-    task = await get_task_by_id(session, task_id, author_id)
-    if task:
-        result = await session.execute(
-            select(Tag).where(and_(Tag.id.in_(tag_ids), Tag.author_id == author_id))
+def _prefix_tsquery(text: str) -> Optional[str]:
+    # каждое слово ищем по префиксу: "отч кв" -> "отч:* & кв:*"
+    terms = re.findall(r"\w+", text.lower())
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+async def _ranked_search_page(
+    session: AsyncSession,
+    query,
+    score,
+    kind: str,
+    limit: int,
+    cursor: Optional[str],
+    fields: Optional[Sequence[str]],
+) -> Tuple[Sequence[Task], Optional[str]]:
+    query = query.add_columns(score).order_by(*keyset_order(score, Task.id, True))
+    if cursor:
+        value, last_id = decode_cursor(cursor, kind)
+        query = query.where(keyset_filter(score, Task.id, True, value, last_id))
+    rows = (await session.execute(query.limit(limit))).all()
+    if fields is None:
+        tasks: Sequence = [row[0] for row in rows]
+    else:
+        tasks = await rows_to_tasks(session, rows, fields)
+    next_page = None
+    if rows and len(rows) == limit:
+        last_id = rows[-1][0].id if fields is None else rows[-1].id
+        next_page = encode_cursor(kind, rows[-1][-1], last_id)
+    return tasks, next_page
+
+
+async def search_tasks_db(
+    session: AsyncSession,
+    author_id: int,
+    text: str,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Tuple[Sequence[Task], Optional[str]]:
+    """Полнотекстовый поиск по названию и описанию с ранжированием.
+
+    Если по словам ничего не нашлось, ищем похожие названия через pg_trgm.
+    Курсор помнит, каким из двух способов была найдена первая страница.
+    """
+    digest = hashlib.sha1(text.encode()).hexdigest()[:12]
+    fts_kind, trgm_kind = f"search:fts:{digest}", f"search:trgm:{digest}"
+    mode = peek_cursor_kind(cursor) if cursor else None
+    if mode not in (None, fts_kind, trgm_kind):
+        raise CursorError("Cursor does not match query parameters")
+
+    tsquery_text = _prefix_tsquery(text)
+    if mode != trgm_kind and tsquery_text:
+        tsquery = func.to_tsquery("simple", tsquery_text)
+        rank = func.ts_rank_cd(Task.search_vector, tsquery)
+        query = select_tasks(fields).where(
+            Task.author_id == author_id, Task.search_vector.op("@@")(tsquery)
+        )
+        found = await _ranked_search_page(
+            session, query, rank, fts_kind, limit, cursor, fields
+        )
+        if found[0] or mode == fts_kind:
+            return found
+
+    await session.execute(
+        select(
+            func.set_config(
+                "pg_trgm.similarity_threshold", str(SEARCH_TRGM_THRESHOLD), True
+            )
         )
+    )
+    similarity = func.similarity(Task.title, text)
+    query = select_tasks(fields).where(
+        Task.author_id == author_id, Task.title.op("%")(text)
+    )
+    return await _ranked_search_page(
+        session, query, similarity, trgm_kind, limit, cursor if mode else None, fields
+    )
 
-        new_valid_tags = result.scalars().all()
-        current_tag_ids = {tag.id for tag in task.tags}
-        valid_tags = []
-        for tag in new_valid_tags:
-            if tag.id not in current_tag_ids:
-                valid_tags.append(tag)
-        task.tags.clear()
-        task.tags.extend(valid_tags)
 
-        await session.commit()
-        await session.refresh(task)
+async def update_tags_task_by_id(
+    session: AsyncSession,
+    task_id: int,
+    author_id: int,
+    tag_ids: List[int],
+    operation: str = "add",
+) -> Optional[Task]:
+    result = await session.execute(
+        select(Task)
+        .where(Task.id == task_id, Task.author_id == author_id)
+        .options(noload(Task.tags))
+    )
+    task = result.scalars().first()
+    if task is None:
+        return None
+    await _change_tags(session, author_id, [task_id], tag_ids, operation)
+    await commit_and_invalidate(session, author_id)
+    await attach_tags(session, [task])
     return task
 
 
+async def change_tasks_tags(
+    session: AsyncSession,
+    author_id: int,
+    task_ids: List[int],
+    tag_ids: List[int],
+    operation: str,
+) -> Tuple[int, int]:
+    """Добавляет, снимает или заменяет теги сразу у многих задач.
+
+    Возвращает количество добавленных и удалённых связей task_tag.
+    """
+    added, removed = await _change_tags(
+        session, author_id, task_ids, tag_ids, operation
+    )
+    await commit_and_invalidate(session, author_id)
+    return added, removed
+
+
+def _deadline_bounds(
+    day_start: Optional[date], day_end: Optional[date]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    start_datetime = end_datetime = None
+    if day_start is not None:
+        start_datetime = datetime.combine(day_start, datetime.min.time()).replace(
+            tzinfo=UTC
+        )
+    if day_end is not None:
+        end_datetime = datetime.combine(day_end, datetime.max.time()).replace(
+            tzinfo=UTC
+        )
+    return start_datetime, end_datetime
+
+
 async def get_tasks_by_deadline_period(
     session: AsyncSession,
     author_id: int,
     day_start: date,
     day_end: date,
     is_completed: bool | None = None,
+    fields: Optional[Sequence[str]] = None,
 ) -> Sequence[Task]:
-    start_datetime = datetime.combine(day_start, datetime.min.time()).replace(
-        tzinfo=UTC
-    )
-    end_datetime = datetime.combine(day_end, datetime.max.time()).replace(tzinfo=UTC)
-    query = select(Task).where(
+    start_datetime, end_datetime = _deadline_bounds(day_start, day_end)
+    query = select_tasks(fields).where(
         and_(
             Task.author_id == author_id,
             Task.deadline.between(start_datetime, end_datetime),
@@ -185,39 +459,372 @@ async def get_tasks_by_deadline_period(
     if is_completed is not None:
         query = query.where(Task.is_completed == is_completed)
 
-    result = await session.execute(query)
-    return result.scalars().all()
+    return await load_tasks(session, query, fields)
 
 
 async def shift_task_deadline_by_id(
     session: AsyncSession, task_id: int, author_id: int, shift: timedelta
 ) -> Optional[Task]:
-    task = await get_task_by_id(session, task_id, author_id)
-    if task and task.deadline:  # type: ignore
-        task.deadline += shift  # type: ignore
-        await session.commit()
-        await session.refresh(task)
+    # сдвиг считает сама БД, поэтому параллельные переносы не теряются
+    task = await _update_task_returning(
+        session,
+        task_id,
+        author_id,
+        {"deadline": Task.deadline + shift},
+        Task.deadline.is_not(None),
+    )
+    if task is None:
+        # задачи без дедлайна возвращаем как есть, как и раньше
+        result = await session.execute(
+            select(Task)
+            .where(Task.id == task_id, Task.author_id == author_id)
+            .options(noload(Task.tags))
+        )
+        task = result.scalars().first()
+    await commit_and_invalidate(session, author_id)
+    if task is not None:
+        await attach_tags(session, [task])
     return task
 
 
 async def get_overdue_tasks_db(
-    session: AsyncSession, author_id: int, skip: int = 0, limit: int = 100
+    session: AsyncSession,
+    author_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
 ) -> Sequence[Task]:
     now = datetime.now(UTC)
 
-    query = (
-        select(Task)
+    required = ["deadline"] if cursor is not None else []
+    query = select_tasks(fields, *required).where(
+        and_(
+            Task.author_id == author_id,
+            Task.deadline < now,
+            Task.is_completed == False,
+        )
+    )
+    if cursor is None:
+        query = query.order_by(Task.deadline.asc()).offset(skip)
+    else:
+        query = query.order_by(*keyset_order(Task.deadline, Task.id, False))
+        if cursor:
+            value, last_id = decode_cursor(cursor, OVERDUE_CURSOR_KIND)
+            query = query.where(
+                keyset_filter(Task.deadline, Task.id, False, value, last_id)
+            )
+
+    return await load_tasks(session, query.limit(limit), fields)
+
+
+async def _link_tags(
+    session: AsyncSession, author_id: int, task_ids: List[int], tag_ids: List[int]
+) -> int:
+    """Привязывает пары (task_ids[i], tag_ids[i]) одним INSERT ... SELECT.
+
+    Единственное место, где создаются связи task_tag. Чужие задачи и теги
+    отсекаются join-ами по author_id, уже существующие связи пропускаются.
+    Возвращает количество добавленных связей.
+    """
+    if not task_ids:
+        return 0
+    pairs = (
+        func.unnest(
+            _array("link_task_ids", task_ids, Integer),
+            _array("link_tag_ids", tag_ids, Integer),
+        )
+        .table_valued(column("task_id", Integer), column("tag_id", Integer))
+        .render_derived(name="pairs")
+    )
+    result = await session.execute(
+        pg_insert(task_tag_table)
+        .from_select(
+            ["task_id", "tag_id"],
+            select(pairs.c.task_id, pairs.c.tag_id)
+            .join(Task, and_(Task.id == pairs.c.task_id, Task.author_id == author_id))
+            .join(Tag, and_(Tag.id == pairs.c.tag_id, Tag.author_id == author_id)),
+        )
+        .on_conflict_do_nothing()
+    )
+    return result.rowcount
+
+
+def _all_pairs(task_ids: List[int], tag_ids: List[int]) -> Tuple[List[int], List[int]]:
+    """Каждый тег к каждой задаче - в виде пар для _link_tags."""
+    task_ids, tag_ids = list(dict.fromkeys(task_ids)), list(dict.fromkeys(tag_ids))
+    return (
+        [task_id for task_id in task_ids for _ in tag_ids],
+        tag_ids * len(task_ids),
+    )
+
+
+def _owned_tasks_filter(author_id: int, task_ids: List[int]):
+    return and_(
+        task_tag_table.c.task_id == any_(_array("scope_task_ids", task_ids, Integer)),
+        task_tag_table.c.task_id.in_(
+            select(Task.id).where(Task.author_id == author_id)
+        ),
+    )
+
+
+async def _change_tags(
+    session: AsyncSession,
+    author_id: int,
+    task_ids: List[int],
+    tag_ids: List[int],
+    operation: str,
+) -> Tuple[int, int]:
+    """Меняет только отличающиеся строки task_tag, не переписывая остальные."""
+    added = removed = 0
+    if operation in ("remove", "replace"):
+        tag_ids_param = _array("change_tag_ids", tag_ids, Integer)
+        if operation == "remove":
+            if not tag_ids:
+                return 0, 0
+            changed = task_tag_table.c.tag_id == any_(tag_ids_param)
+        else:
+            # != ALL от пустого массива истинно: replace на [] снимает все теги
+            changed = task_tag_table.c.tag_id != all_(tag_ids_param)
+        result = await session.execute(
+            delete(task_tag_table).where(
+                _owned_tasks_filter(author_id, task_ids), changed
+            )
+        )
+        removed = result.rowcount
+    if operation in ("add", "replace"):
+        added = await _link_tags(session, author_id, *_all_pairs(task_ids, tag_ids))
+    return added, removed
+
+
+async def _replace_tag_pairs(
+    session: AsyncSession, author_id: int, tags_by_task: dict
+) -> None:
+    """Приводит теги каждой задачи к tags_by_task[task_id], трогая только разницу."""
+    link_task_ids, link_tag_ids = [], []
+    for task_id, tag_ids in tags_by_task.items():
+        for tag_id in tag_ids:
+            link_task_ids.append(task_id)
+            link_tag_ids.append(tag_id)
+    wanted = (
+        func.unnest(
+            _array("keep_task_ids", link_task_ids, Integer),
+            _array("keep_tag_ids", link_tag_ids, Integer),
+        )
+        .table_valued(column("task_id", Integer), column("tag_id", Integer))
+        .render_derived(name="wanted")
+    )
+    await session.execute(
+        delete(task_tag_table).where(
+            _owned_tasks_filter(author_id, list(tags_by_task)),
+            tuple_(task_tag_table.c.task_id, task_tag_table.c.tag_id).not_in(
+                select(wanted.c.task_id, wanted.c.tag_id)
+            ),
+        )
+    )
+    await _link_tags(session, author_id, link_task_ids, link_tag_ids)
+
+
+async def create_tasks_bulk(
+    session: AsyncSession, items: List[TaskCreate], author_id: int
+) -> List[int]:
+    now = datetime.now(UTC)
+    rows = [
+        {
+            "title": item.title,
+            "description": item.description,
+            "priority": item.priority,
+            "deadline": _as_utc(item.deadline),
+            "created_at": now,
+            "is_completed": False,
+            "author_id": author_id,
+        }
+        for item in items
+    ]
+    # многострочный INSERT ... RETURNING, id возвращаются в порядке items
+    result = await session.execute(
+        insert(Task).returning(Task.id, sort_by_parameter_order=True), rows
+    )
+    task_ids = list(result.scalars().all())
+
+    # имена тегов всей пачки разрешаем одним upsert
+    ids_by_name = await _tag_ids_by_name(
+        session, author_id, [name for item in items for name in item.tag_names]
+    )
+    link_task_ids, link_tag_ids = [], []
+    for task_id, item in zip(task_ids, items):
+        item_tag_ids = [tag.id for tag in item.tags]
+        item_tag_ids += [ids_by_name[name] for name in item.tag_names]
+        link_task_ids += [task_id] * len(item_tag_ids)
+        link_tag_ids += item_tag_ids
+    await _link_tags(session, author_id, link_task_ids, link_tag_ids)
+
+    await commit_and_invalidate(session, author_id)
+    return task_ids
+
+
+async def update_tasks_bulk(
+    session: AsyncSession, items: List[TaskBulkUpdate], author_id: int
+) -> List[int]:
+    """Обновляет задачи одним UPDATE ... FROM unnest(...).
+
+    Как и в update_task_by_id, None означает «не менять поле».
+    Возвращает id задач, которые нашлись у автора.
+    """
+    values = (
+        func.unnest(
+            _array("ids", [item.id for item in items], Integer),
+            _array("titles", [item.title for item in items], String),
+            _array("descriptions", [item.description for item in items], String),
+            _array("priorities", [item.priority for item in items], Integer),
+            _array("completed", [item.is_completed for item in items], Boolean),
+            _array(
+                "deadlines",
+                [_as_utc(item.deadline) for item in items],
+                DateTime(timezone=True),
+            ),
+        )
+        .table_valued(
+            column("id", Integer),
+            column("title", String),
+            column("description", String),
+            column("priority", Integer),
+            column("is_completed", Boolean),
+            column("deadline", DateTime(timezone=True)),
+        )
+        .render_derived(name="v")
+    )
+    result = await session.execute(
+        update(Task)
+        .where(Task.id == values.c.id, Task.author_id == author_id)
+        .values(
+            title=func.coalesce(values.c.title, Task.title),
+            description=func.coalesce(values.c.description, Task.description),
+            priority=func.coalesce(values.c.priority, Task.priority),
+            is_completed=func.coalesce(values.c.is_completed, Task.is_completed),
+            deadline=func.coalesce(values.c.deadline, Task.deadline),
+        )
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    updated_ids = set(result.scalars().all())
+
+    retagged = [i for i in items if i.replaces_tags and i.id in updated_ids]
+    ids_by_name = await _tag_ids_by_name(
+        session, author_id, [name for i in retagged for name in i.tag_names or []]
+    )
+    tags_by_task = {
+        item.id: (item.tag_ids or [])
+        + [ids_by_name[name] for name in item.tag_names or []]
+        for item in retagged
+    }
+    if tags_by_task:
+        await _replace_tag_pairs(session, author_id, tags_by_task)
+
+    await commit_and_invalidate(session, author_id)
+    return [item.id for item in items if item.id in updated_ids]
+
+
+async def delete_tasks_bulk(
+    session: AsyncSession, task_ids: List[int], author_id: int
+) -> List[int]:
+    result = await session.execute(
+        delete(Task)
         .where(
-            and_(
-                Task.author_id == author_id,
-                Task.deadline < now,
-                Task.is_completed == False,
+            Task.id == any_(_array("ids", task_ids, Integer)),
+            Task.author_id == author_id,
+        )
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted_ids = list(result.scalars().all())
+    await commit_and_invalidate(session, author_id)
+    return deleted_ids
+
+
+def _filter_conditions(author_id: int, task_filter: TaskFilter) -> list:
+    """Условия WHERE для TaskFilter: те же, что у выборок по дедлайну и тегу."""
+    conditions = [Task.author_id == author_id]
+    start_datetime, end_datetime = _deadline_bounds(
+        task_filter.day_start, task_filter.day_end
+    )
+    if start_datetime is not None:
+        conditions.append(Task.deadline >= start_datetime)
+    if end_datetime is not None:
+        conditions.append(Task.deadline <= end_datetime)
+    if task_filter.tag_id is not None:
+        conditions.append(
+            Task.id.in_(
+                select(task_tag_table.c.task_id)
+                .join(Tag, Tag.id == task_tag_table.c.tag_id)
+                .where(Tag.id == task_filter.tag_id, Tag.author_id == author_id)
             )
         )
-        .order_by(Task.deadline.asc())
-        .offset(skip)
-        .limit(limit)
+    if task_filter.is_completed is not None:
+        conditions.append(Task.is_completed == task_filter.is_completed)
+    return conditions
+
+
+def _shift_conditions(author_id: int, task_filter: TaskFilter) -> list:
+    return _filter_conditions(author_id, task_filter) + [Task.deadline.is_not(None)]
+
+
+def _complete_conditions(author_id: int, task_filter: TaskFilter) -> list:
+    # уже выполненные задачи не трогаем, чтобы не писать строки впустую
+    return _filter_conditions(author_id, task_filter) + [Task.is_completed.is_(False)]
+
+
+async def _count_tasks(session: AsyncSession, conditions: list) -> int:
+    result = await session.execute(
+        select(func.count()).select_from(Task).where(*conditions)
     )
+    return result.scalar_one()
 
-    result = await session.execute(query)
-    return result.scalars().all()
+
+async def _update_tasks_returning_ids(
+    session: AsyncSession, author_id: int, conditions: list, values: dict
+) -> List[int]:
+    result = await session.execute(
+        update(Task)
+        .where(*conditions)
+        .values(**values)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    task_ids = list(result.scalars().all())
+    await commit_and_invalidate(session, author_id)
+    return task_ids
+
+
+async def count_tasks_to_shift(
+    session: AsyncSession, author_id: int, task_filter: TaskFilter
+) -> int:
+    return await _count_tasks(session, _shift_conditions(author_id, task_filter))
+
+
+async def shift_tasks_deadline_by_filter(
+    session: AsyncSession, author_id: int, task_filter: TaskFilter, shift: timedelta
+) -> List[int]:
+    return await _update_tasks_returning_ids(
+        session,
+        author_id,
+        _shift_conditions(author_id, task_filter),
+        {"deadline": Task.deadline + shift},
+    )
+
+
+async def count_tasks_to_complete(
+    session: AsyncSession, author_id: int, task_filter: TaskFilter
+) -> int:
+    return await _count_tasks(session, _complete_conditions(author_id, task_filter))
+
+
+async def complete_tasks_by_filter(
+    session: AsyncSession, author_id: int, task_filter: TaskFilter
+) -> List[int]:
+    return await _update_tasks_returning_ids(
+        session,
+        author_id,
+        _complete_conditions(author_id, task_filter),
+        {"is_completed": True},
+    )
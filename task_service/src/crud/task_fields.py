@@ -0,0 +1,112 @@
+from typing import List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.models.tag import Tag
+from src.models.task import Task
+from src.models.task_tag import task_tag_table
+
+TASK_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "priority",
+    "created_at",
+    "deadline",
+    "is_completed",
+    "author_id",
+)
+TAGS_FIELD = "tags"
+# все поля TaskResponse: так списки отдаются, если fields не задан
+ALL_TASK_FIELDS = [*TASK_FIELDS, TAGS_FIELD]
+
+
+def select_tasks(fields: Optional[Sequence[str]] = None, *required: str):
+    """SELECT задач: целиком с тегами (fields=None) или только нужные колонки.
+
+    id и колонки из required (например, поле сортировки для курсора)
+    выбираются всегда. Теги в режиме колонок подгружает load_tasks.
+    """
+    if fields is None:
+        return select(Task).options(selectinload(Task.tags))
+    wanted = {"id", *required, *fields}
+    # порядок колонок как в TaskResponse - от него зависит порядок ключей в JSON
+    return select(*(getattr(Task, name) for name in TASK_FIELDS if name in wanted))
+
+
+async def tags_by_task(session: AsyncSession, task_ids: Sequence[int]) -> dict:
+    """Теги для набора задач одним запросом: {task_id: [Tag, ...]}."""
+    result: dict = {task_id: [] for task_id in task_ids}
+    if not result:
+        return result
+    rows = await session.execute(
+        select(task_tag_table.c.task_id, Tag)
+        .join(Tag, Tag.id == task_tag_table.c.tag_id)
+        .where(task_tag_table.c.task_id.in_(list(result)))
+        .order_by(Tag.id)
+    )
+    for task_id, tag in rows.all():
+        result[task_id].append(tag)
+    return result
+
+
+async def attach_tags(session: AsyncSession, tasks: Sequence[Task]) -> None:
+    """Проставляет теги уже полученным задачам без ленивой загрузки."""
+    tags = await tags_by_task(session, [task.id for task in tasks])
+    for task in tasks:
+        set_committed_value(task, "tags", tags[task.id])
+
+
+async def tag_rows_by_task(session: AsyncSession, task_ids: Sequence[int]) -> dict:
+    """То же, что tags_by_task, но теги - словари без ORM-объектов."""
+    result: dict = {task_id: [] for task_id in task_ids}
+    if not result:
+        return result
+    rows = await session.execute(
+        select(task_tag_table.c.task_id, Tag.id, Tag.name, Tag.author_id)
+        .join(Tag, Tag.id == task_tag_table.c.tag_id)
+        .where(task_tag_table.c.task_id.in_(list(result)))
+        .order_by(Tag.id)
+    )
+    for task_id, tag_id, name, author_id in rows.all():
+        result[task_id].append({"id": tag_id, "name": name, "author_id": author_id})
+    return result
+
+
+def task_rows_to_dicts(
+    keys: Sequence[str], rows: Sequence[tuple], tags: Optional[dict] = None
+) -> List[dict]:
+    """Собирает задачи-словари из кортежей строк, минуя ORM и валидацию Pydantic.
+
+    Колонки не из TASK_FIELDS (например, ранг поиска) отбрасываются.
+    """
+    positions = [(i, key) for i, key in enumerate(keys) if key in TASK_FIELDS]
+    tasks = [{key: row[i] for i, key in positions} for row in rows]
+    if tags is not None:
+        for task in tasks:
+            task[TAGS_FIELD] = tags[task["id"]]
+    return tasks
+
+
+async def rows_to_tasks(
+    session: AsyncSession, rows: Sequence, fields: Sequence[str]
+) -> List[dict]:
+    if not rows:
+        return []
+    tags = None
+    if TAGS_FIELD in fields:
+        tags = await tag_rows_by_task(session, [row.id for row in rows])
+    return task_rows_to_dicts(rows[0]._fields, rows, tags)
+
+
+async def load_tasks(
+    session: AsyncSession, query, fields: Optional[Sequence[str]] = None
+) -> Sequence:
+    """Выполняет запрос из select_tasks: ORM-задачи или словари с полями fields."""
+    result = await session.execute(query)
+    if fields is None:
+        return result.scalars().all()
+    return await rows_to_tasks(session, result.all(), fields)
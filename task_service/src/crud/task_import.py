@@ -0,0 +1,147 @@
+from typing import List
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.query_cache import commit_and_invalidate
+from src.models.tag import Tag
+from src.models.task import Task
+from src.models.task_tag import task_tag_table
+from src.schemas.task import TaskImportRow
+
+# временная таблица живёт до конца транзакции импорта; отдельная MetaData,
+# чтобы её не видели create_all и автогенерация миграций
+staging_table = Table(
+    "task_import_staging",
+    MetaData(),
+    Column("id", Integer),
+    Column("title", String),
+    Column("description", String),
+    Column("priority", Integer),
+    Column("deadline", DateTime(timezone=True)),
+    Column("created_at", DateTime(timezone=True)),
+    Column("is_completed", Boolean),
+    Column("tag_names", ARRAY(String)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+STAGING_COLUMNS = [column.name for column in staging_table.columns]
+
+
+async def start_task_import(session: AsyncSession):
+    """Создаёт staging-таблицу и возвращает соединение asyncpg для COPY.
+
+    Всё, что загружено дальше, коммитится одной транзакцией в finish_task_import.
+    """
+    connection = await session.connection()
+    await connection.run_sync(staging_table.create)
+    raw = await connection.get_raw_connection()
+    return raw.driver_connection
+
+
+async def import_tasks_batch(
+    session: AsyncSession, driver_connection, author_id: int, rows: List[TaskImportRow]
+) -> int:
+    """Пачка строк: COPY в staging, затем INSERT ... SELECT в tasks и task_tag.
+
+    id задач берутся из последовательности заранее, поэтому связи с тегами
+    строятся прямо из staging без RETURNING и сопоставления строк.
+    """
+    if not rows:
+        return 0
+    ids = (
+        await session.execute(
+            select(
+                func.nextval(func.pg_get_serial_sequence(Task.__tablename__, "id"))
+            ).select_from(func.generate_series(1, len(rows)))
+        )
+    ).scalars()
+    await driver_connection.copy_records_to_table(
+        staging_table.name,
+        records=[
+            (
+                task_id,
+                row.title,
+                row.description,
+                row.priority,
+                row.deadline,
+                row.created_at,
+                row.is_completed,
+                row.tags,
+            )
+            for task_id, row in zip(ids, rows)
+        ],
+        columns=STAGING_COLUMNS,
+    )
+
+    staged = staging_table.c
+    await session.execute(
+        insert(Task).from_select(
+            [
+                Task.id,
+                Task.title,
+                Task.description,
+                Task.priority,
+                Task.deadline,
+                Task.created_at,
+                Task.is_completed,
+                Task.author_id,
+            ],
+            select(
+                staged.id,
+                staged.title,
+                staged.description,
+                staged.priority,
+                staged.deadline,
+                func.coalesce(staged.created_at, func.now()),
+                staged.is_completed,
+                literal(author_id),
+            ),
+        )
+    )
+
+    # теги по именам: недостающие создаются одним INSERT ... ON CONFLICT
+    names = select(func.unnest(staged.tag_names).label("name")).subquery()
+    await session.execute(
+        pg_insert(Tag)
+        .from_select(
+            [Tag.name, Tag.author_id],
+            select(names.c.name, literal(author_id)).distinct(),
+        )
+        .on_conflict_do_nothing(index_elements=[Tag.author_id, Tag.name])
+    )
+    pairs = select(
+        staged.id.label("task_id"), func.unnest(staged.tag_names).label("name")
+    ).subquery()
+    await session.execute(
+        pg_insert(task_tag_table)
+        .from_select(
+            ["task_id", "tag_id"],
+            select(pairs.c.task_id, Tag.id)
+            .select_from(pairs)
+            .join(Tag, and_(Tag.author_id == author_id, Tag.name == pairs.c.name)),
+        )
+        .on_conflict_do_nothing()
+    )
+    await session.execute(text(f"TRUNCATE {staging_table.name}"))
+    return len(rows)
+
+
+async def finish_task_import(session: AsyncSession, author_id: int) -> None:
+    await commit_and_invalidate(session, author_id)
@@ -1,20 +1,186 @@
-from typing import AsyncGenerator, cast
+import itertools
+import logging
+import time
+from typing import AsyncGenerator, List, Optional, cast
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from fastapi import Depends
+from fastapi import Depends, Request
 
-from src.core.config import DATABASE_URL
+from src.core.cache import TTLCache
+from src.core.config import (
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_READ_YOUR_WRITES_MAX_SIZE,
+    DB_READ_YOUR_WRITES_SECONDS,
+    DB_REPLICA_RETRY_SECONDS,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_STATEMENT_TIMEOUT_MS,
+)
+from src.dependencies.auth import get_current_user
+
+logger = logging.getLogger(__name__)
 
 assert DATABASE_URL is not None, "DATABASE_URL is not set"
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+
+def engine_options(url: str) -> dict:
+    """Параметры create_async_engine из настроек DB_*.
+
+    Пул и параметры asyncpg применяются только к PostgreSQL.
+    """
+    options: dict = {"echo": DB_ECHO}
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        connect_args: dict = {
+            # кэш prepared statements SQLAlchemy и собственный кэш asyncpg
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        }
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)
+            }
+        options["connect_args"] = connect_args
+    return options
+
+
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 AsyncSessionLocal = sessionmaker(
     class_=AsyncSession, expire_on_commit=False, autoflush=False, autocommit=False
 )
 AsyncSessionLocal.configure(bind=engine)
 
 
+class ReplicaRouter:
+    """Выбор реплики для чтения: по кругу, в обход недоступных.
+
+    После записи автора его чтения DB_READ_YOUR_WRITES_SECONDS идут в основную
+    БД, чтобы он увидел свои изменения, даже если реплика отстаёт. Запись
+    в этом воркере отмечает mark_write; о записях в других воркерах говорит
+    версия query_cache - она не ниже time_ns момента записи.
+    """
+
+    def __init__(
+        self,
+        replicas: List[AsyncEngine],
+        sticky_seconds: float,
+        sticky_max_size: int,
+        retry_seconds: float,
+    ):
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self.sticky_ns = int(sticky_seconds * 1e9)
+        self.recent_writers = TTLCache(maxsize=sticky_max_size, ttl=sticky_seconds)
+        self._down_until: dict = {}
+        self._next = itertools.count()
+
+    def mark_write(self, author_id: int) -> None:
+        if self.replicas:
+            self.recent_writers.set(author_id, True)
+
+    def mark_down(self, replica: AsyncEngine) -> None:
+        self._down_until[replica] = time.monotonic() + self.retry_seconds
+
+    def choose(
+        self, author_id: int, version: Optional[int] = None
+    ) -> Optional[AsyncEngine]:
+        """Реплика для чтения или None, если читать нужно из основной БД."""
+        if not self.replicas or self.recent_writers.get(author_id):
+            return None
+        if version is not None and time.time_ns() - version < self.sticky_ns:
+            return None
+        now = time.monotonic()
+        start = next(self._next)
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(start + i) % len(self.replicas)]
+            if self._down_until.get(replica, 0) <= now:
+                return replica
+        return None
+
+
+replica_router = ReplicaRouter(
+    [create_async_engine(url, **engine_options(url)) for url in DATABASE_REPLICA_URLS],
+    sticky_seconds=DB_READ_YOUR_WRITES_SECONDS,
+    sticky_max_size=DB_READ_YOUR_WRITES_MAX_SIZE,
+    retry_seconds=DB_REPLICA_RETRY_SECONDS,
+)
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with cast(AsyncSession, AsyncSessionLocal()) as session:
         yield session
+
+
+async def _replica_session(replica: AsyncEngine) -> Optional[AsyncSession]:
+    session = cast(AsyncSession, AsyncSessionLocal(bind=replica))
+    try:
+        # соединение берём сразу, чтобы при недоступной реплике уйти в основную БД
+        await session.connection()
+    except (DBAPIError, OSError):
+        logger.warning("replica %s is unavailable, using primary", replica.url)
+        replica_router.mark_down(replica)
+        await session.close()
+        return None
+    return session
+
+
+async def open_read_session(
+    author_id: int, version: Optional[int] = None
+) -> AsyncSession:
+    """Сессия для чтения данных автора: реплика или основная БД.
+
+    version - версия query_cache, под которой будет закэширован результат.
+    """
+    replica = replica_router.choose(author_id, version)
+    session = await _replica_session(replica) if replica is not None else None
+    if session is None:
+        session = cast(AsyncSession, AsyncSessionLocal())
+    return session
+
+
+async def get_read_session(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Сессия для эндпоинтов только на чтение.
+
+    Версия кэша читается до выбора реплики и сохраняется в request.state:
+    cached_json_response кэширует ответ под ней же. Иначе запись, прошедшая
+    между выбором и чтением версии, оставила бы под новой версией строки
+    с отстающей реплики.
+    """
+    # query_cache сам импортирует этот модуль
+    from src.core.query_cache import query_cache
+
+    author_id = current_user["id"]
+    version = None
+    if replica_router.replicas:
+        version = request.state.query_cache_version = await query_cache.version(
+            author_id
+        )
+    async with await open_read_session(author_id, version) as session:
+        yield session
+
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    for replica in replica_router.replicas:
+        await replica.dispose()
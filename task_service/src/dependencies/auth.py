@@ -1,34 +1,110 @@
+import asyncio
+import hashlib
+import time
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from httpx import AsyncClient, ConnectError, ReadError, TimeoutException
+from httpx import TransportError
+from jose import JWTError, jwt
 
-from src.core.config import AUTH_SERVICE_URL
+from src.core.auth_client import breaker, get_auth_client
+from src.core.cache import TTLCache
+from src.core.circuit_breaker import CircuitBreakerOpen
+from src.core.config import (
+    AUTH_CACHE_MAX_SIZE,
+    AUTH_CACHE_TTL_SECONDS,
+    AUTH_REMOTE_FALLBACK,
+    AUTH_VERIFY_MODE,
+)
+from src.core.security import decode_access_token, user_from_claims
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="http://localhost:8000/auth/login") # нужно указывать localhost, что авторизация через Swager UI работала.
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    async with AsyncClient() as client:
-        try:
-            assert AUTH_SERVICE_URL is not None, "AUTH_SERVICE_URL is not set"
-            response = await client.get(
-                f'{AUTH_SERVICE_URL}/auth/me',
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            if response.status_code != status.HTTP_200_OK:
+
+user_cache = TTLCache(maxsize=AUTH_CACHE_MAX_SIZE, ttl=AUTH_CACHE_TTL_SECONDS)
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def _token_ttl(token: str) -> Optional[float]:
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return None
+    if exp is None:
+        return None
+    return float(exp) - time.time()
+
+
+async def _request_current_user(token: str) -> dict:
+    client = await get_auth_client()
+    try:
+        async with breaker.call():
+            try:
+                response = await client.get(
+                    "/auth/me", headers={"Authorization": f"Bearer {token}"}
+                )
+            except TransportError as e:
                 raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid or expired token",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Auth service unavailable: {str(e)}",
                 )
-            return response.json()
-        except (ConnectError, ReadError, TimeoutException) as e:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"Auth service unavailable: {str(e)}",
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Unexpected error: {str(e)}",
-            )
+            if response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Auth service unavailable: {response.status_code}",
+                )
+    except CircuitBreakerOpen:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Auth service unavailable: circuit breaker is open",
+        )
+    if response.status_code != status.HTTP_200_OK:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+        )
+    return response.json()
+
+
+async def _load_current_user(token: str, key: str) -> dict:
+    user = await _request_current_user(token)
+    user_cache.set(key, user, _token_ttl(token))
+    return user
+
+
+async def fetch_current_user(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).hexdigest()
+    user = user_cache.get(key)
+    if user is not None:
+        return user
+
+    # одновременные запросы с одним и тем же токеном ждут один вызов auth_service
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_load_current_user(token, key))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
 
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+    if AUTH_VERIFY_MODE == "remote":
+        return await fetch_current_user(token)
 
+    claims = await decode_access_token(token)
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+        )
+    user = user_from_claims(claims)
+    if user is None:
+        # старые токены без id в claims - проверяем через auth_service, если разрешено
+        if AUTH_REMOTE_FALLBACK:
+            return await fetch_current_user(token)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+        )
+    return user
@@ -0,0 +1,48 @@
+from typing import List, Optional
+
+from fastapi import Depends, HTTPException, Query
+
+from src.crud.task_fields import ALL_TASK_FIELDS, TAGS_FIELD, TASK_FIELDS
+
+
+def task_shape(
+    shape: str = Query(
+        "embedded",
+        description="embedded - теги внутри каждой задачи; normalized - "
+        "{items, tags}: теги один раз в словаре по id, у задач только tag_ids",
+        regex="^(embedded|normalized)$",
+    ),
+) -> str:
+    return shape
+
+
+def task_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Поля задачи через запятую, например id,title,deadline. "
+        "id возвращается всегда, при курсорной пагинации - и поле сортировки",
+    ),
+    include: Optional[str] = Query(
+        None, description="Связанные данные: tags (имеет смысл вместе с fields)"
+    ),
+    shape: str = Depends(task_shape),
+) -> List[str]:
+    """Разбирает fields/include; без fields задачи отдаются целиком, с тегами."""
+    included = [name.strip() for name in (include or "").split(",") if name.strip()]
+    unknown = [name for name in included if name != TAGS_FIELD]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown include: {', '.join(unknown)}"
+        )
+    if shape == "normalized" and TAGS_FIELD not in included:
+        included.append(TAGS_FIELD)
+    if fields is None:
+        return ALL_TASK_FIELDS
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in TASK_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return list(dict.fromkeys(names)) + list(dict.fromkeys(included))
@@ -0,0 +1,181 @@
+"""Сверка счётчиков task_stats/tag_stats с tasks/task_tag и починка расхождений.
+
+Запуск из каталога task_service (например, раз в сутки по cron):
+
+    python -m src.jobs.reconcile_stats [--dry-run]
+
+Поиск расхождений - один агрегирующий запрос на таблицу. Каждая найденная
+строка чинится в своей транзакции: строка счётчика создаётся, если её нет,
+и блокируется FOR UPDATE до пересчёта. Пересчёт видит все записи, чьи
+триггеры успели её изменить, а триггеры более поздних ждут блокировку и
+прибавляют дельту уже к исправленному значению.
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import List, cast
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.session import AsyncSessionLocal, dispose_engines
+from src.models.stats import PRIORITIES, TagStats, TaskStats
+from src.models.tag import Tag
+from src.models.task import Task
+from src.models.task_tag import task_tag_table
+
+logger = logging.getLogger("reconcile_stats")
+
+TASK_COUNTERS = ["total", "completed", *(f"priority_{p}" for p in PRIORITIES)]
+
+
+def _actual_task_stats():
+    return select(
+        Task.author_id.label("author_id"),
+        func.count().label("total"),
+        func.count().filter(Task.is_completed == True).label("completed"),
+        *(
+            func.count().filter(Task.priority == p).label(f"priority_{p}")
+            for p in PRIORITIES
+        ),
+    ).group_by(Task.author_id)
+
+
+def _actual_tag_stats():
+    return select(
+        task_tag_table.c.tag_id.label("tag_id"),
+        func.count().label("task_count"),
+    ).group_by(task_tag_table.c.tag_id)
+
+
+async def find_task_stats_drift(session: AsyncSession) -> List[int]:
+    actual = _actual_task_stats().subquery()
+    stored = TaskStats.__table__
+    result = await session.execute(
+        select(func.coalesce(actual.c.author_id, stored.c.author_id))
+        .select_from(
+            actual.join(stored, actual.c.author_id == stored.c.author_id, full=True)
+        )
+        .where(
+            or_(
+                *(
+                    func.coalesce(actual.c[name], 0) != func.coalesce(stored.c[name], 0)
+                    for name in TASK_COUNTERS
+                )
+            )
+        )
+    )
+    return list(result.scalars())
+
+
+async def find_tag_stats_drift(session: AsyncSession) -> List[int]:
+    actual = _actual_tag_stats().subquery()
+    stored = TagStats.__table__
+    result = await session.execute(
+        select(func.coalesce(actual.c.tag_id, stored.c.tag_id))
+        .select_from(actual.join(stored, actual.c.tag_id == stored.c.tag_id, full=True))
+        .where(
+            func.coalesce(actual.c.task_count, 0)
+            != func.coalesce(stored.c.task_count, 0)
+        )
+    )
+    return list(result.scalars())
+
+
+async def repair_task_stats(session: AsyncSession, author_id: int) -> None:
+    # сначала строка должна существовать: FOR UPDATE по отсутствующей строке
+    # ничего не блокирует, и вставка триггера параллельной записи потерялась бы
+    await session.execute(
+        pg_insert(TaskStats)
+        .values(author_id=author_id)
+        .on_conflict_do_nothing(index_elements=[TaskStats.author_id])
+    )
+    await session.execute(
+        select(TaskStats.author_id)
+        .where(TaskStats.author_id == author_id)
+        .with_for_update()
+    )
+    row = (
+        await session.execute(_actual_task_stats().where(Task.author_id == author_id))
+    ).one_or_none()
+    values = {name: row._mapping[name] if row else 0 for name in TASK_COUNTERS}
+    await session.execute(
+        update(TaskStats)
+        .where(TaskStats.author_id == author_id)
+        .values(updated_at=func.now(), **values)
+    )
+    await session.commit()
+
+
+async def repair_tag_stats(session: AsyncSession, tag_id: int) -> None:
+    author_id = await session.scalar(select(Tag.author_id).where(Tag.id == tag_id))
+    if author_id is None:
+        # тег удалён, его строку tag_stats уже убрал ON DELETE CASCADE
+        await session.rollback()
+        return
+    try:
+        # как в repair_task_stats: блокировать можно только существующую строку
+        await session.execute(
+            pg_insert(TagStats)
+            .values(tag_id=tag_id, author_id=author_id)
+            .on_conflict_do_nothing(index_elements=[TagStats.tag_id])
+        )
+    except IntegrityError:
+        # тег удалили между проверкой и вставкой
+        await session.rollback()
+        return
+    await session.execute(
+        select(TagStats.tag_id).where(TagStats.tag_id == tag_id).with_for_update()
+    )
+    task_count = (
+        await session.execute(
+            select(func.count())
+            .select_from(task_tag_table)
+            .where(task_tag_table.c.tag_id == tag_id)
+        )
+    ).scalar_one()
+    await session.execute(
+        update(TagStats).where(TagStats.tag_id == tag_id).values(task_count=task_count)
+    )
+    await session.commit()
+
+
+async def reconcile(dry_run: bool = False) -> dict:
+    report = {}
+    async with cast(AsyncSession, AsyncSessionLocal()) as session:
+        for name, find, repair in (
+            ("task_stats", find_task_stats_drift, repair_task_stats),
+            ("tag_stats", find_tag_stats_drift, repair_tag_stats),
+        ):
+            drifted = await find(session)
+            # поиск только читает - закрываем транзакцию перед починкой
+            await session.rollback()
+            logger.info("%s: %d rows drifted", name, len(drifted))
+            if not dry_run:
+                for key in drifted:
+                    await repair(session, key)
+            report[name] = {
+                "drifted": len(drifted),
+                "repaired": 0 if dry_run else len(drifted),
+            }
+    return report
+
+
+async def main(dry_run: bool) -> None:
+    try:
+        print(await reconcile(dry_run))
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dry-run", action="store_true", help="только найти расхождения"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.dry_run))
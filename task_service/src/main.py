@@ -1,8 +1,41 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+
+from src.core.auth_client import close_auth_client, start_auth_client
+from src.core.cache_listener import cache_listener
+from src.core.pagination import CursorError
+from src.core.query_cache import query_cache
+from src.db.session import dispose_engines
 from src.routers.task import router as task_router
 from src.routers.tag import router as tag_router
+from src.routers.health import router as health_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_auth_client()
+    if cache_listener is not None:
+        cache_listener.start()
+    yield
+    if cache_listener is not None:
+        await cache_listener.stop()
+    await close_auth_client()
+    await query_cache.close()
+    await dispose_engines()
+
+
+app = FastAPI(title="Task Service", lifespan=lifespan)
+
+
+@app.exception_handler(CursorError)
+async def cursor_error_handler(request: Request, exc: CursorError):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)}
+    )
 
-app = FastAPI(title="Task Service")
 
 app.include_router(task_router, prefix="/tasks", tags=["tasks"])
 app.include_router(tag_router, prefix="/tags", tags=["tags"])
+app.include_router(health_router, prefix="/health", tags=["health"])
@@ -7,6 +7,7 @@ from alembic import context
 
 from src.core.config import DATABASE_URL
 from src.models.task import Task  # noqa
+from src.models.stats import TagStats, TaskStats  # noqa
 from src.db.base import Base
 
 config = context.config
@@ -0,0 +1,80 @@
+"""unique tag names
+
+Revision ID: 5c1e9a7b3f24
+Revises: d30d7edb0660
+Create Date: 2026-10-18 11:24:08.915230
+
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9a7b3f24'
+down_revision: Union[str, None] = 'd30d7edb0660'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# как TagName.strip_whitespace в src/schemas/tag.py: " a" и "a" - один тег
+TRIMMED_NAME = r"regexp_replace({}.name, '^\s+|\s+$', '', 'g')"
+
+
+def _index_valid(name: str) -> Optional[bool]:
+    """indisvalid индекса или None, если его нет."""
+    return op.get_bind().execute(
+        sa.text(
+            "SELECT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+        ),
+        {"name": name},
+    ).scalar()
+
+
+def upgrade() -> None:
+    # неудавшийся CREATE INDEX CONCURRENTLY оставляет INVALID-индекс: он уже
+    # проверяет уникальность новых строк, но для ON CONFLICT не годится,
+    # а if_not_exists его не пересоздаст
+    with op.get_context().autocommit_block():
+        if _index_valid('uq_tags_author_id_name') is False:
+            op.drop_index('uq_tags_author_id_name', table_name='tags', postgresql_concurrently=True)
+
+    # дубли тегов одного автора (с точностью до пробелов по краям) сливаем
+    # в самый старый: сначала переносим связи
+    op.execute(
+        "INSERT INTO task_tag (task_id, tag_id) "
+        "SELECT task_tag.task_id, keep.id FROM task_tag "
+        "JOIN tags dup ON dup.id = task_tag.tag_id "
+        f"JOIN (SELECT author_id, {TRIMMED_NAME.format('tags')} AS name, min(id) AS id FROM tags "
+        f"GROUP BY author_id, {TRIMMED_NAME.format('tags')} HAVING count(*) > 1) keep "
+        f"ON keep.author_id = dup.author_id AND keep.name = {TRIMMED_NAME.format('dup')} "
+        "AND keep.id <> dup.id "
+        "ON CONFLICT DO NOTHING"
+    )
+    # связи удалённых дублей уходят по ON DELETE CASCADE
+    op.execute(
+        "DELETE FROM tags a USING tags b "
+        f"WHERE a.author_id = b.author_id AND {TRIMMED_NAME.format('a')} = {TRIMMED_NAME.format('b')} "
+        "AND a.id > b.id"
+    )
+    op.execute(
+        f"UPDATE tags SET name = {TRIMMED_NAME.format('tags')} "
+        f"WHERE name <> {TRIMMED_NAME.format('tags')}"
+    )
+
+    with op.get_context().autocommit_block():
+        # если приложение успело вставить дубль, сборка упадёт; повторный
+        # запуск миграции удалит INVALID-индекс и сольёт дубли заново
+        op.create_index('uq_tags_author_id_name', 'tags', ['author_id', 'name'], unique=True, postgresql_concurrently=True, if_not_exists=True)
+        if not _index_valid('uq_tags_author_id_name'):
+            raise RuntimeError("uq_tags_author_id_name is not valid, rerun the migration")
+        # старый индекс убираем, только когда новый точно рабочий
+        op.drop_index('ix_tags_author_id_name', table_name='tags', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tags_author_id_name', 'tags', ['author_id', 'name'], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('uq_tags_author_id_name', table_name='tags', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,162 @@
+"""task stats
+
+Revision ID: 8b2d4f6a1c37
+Revises: 5c1e9a7b3f24
+Create Date: 2026-10-18 14:05:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2d4f6a1c37'
+down_revision: Union[str, None] = '5c1e9a7b3f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PRIORITIES = range(1, 6)
+
+# дельты считаются по transition tables один раз на оператор, а не на строку:
+# INSERT ... SELECT из импорта на 5000 строк - одно обновление счётчиков автора;
+# нулевые дельты (UPDATE только title и т.п.) строку счётчиков не трогают
+TASK_STATS_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    changes text;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT author_id, 1 AS sign, is_completed, priority FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := 'SELECT author_id, -1 AS sign, is_completed, priority FROM old_rows';
+    ELSE
+        changes := 'SELECT author_id, 1 AS sign, is_completed, priority FROM new_rows '
+                   'UNION ALL '
+                   'SELECT author_id, -1, is_completed, priority FROM old_rows';
+    END IF;
+    EXECUTE
+        'INSERT INTO task_stats AS s (author_id, total, completed, '
+        'priority_1, priority_2, priority_3, priority_4, priority_5) '
+        'SELECT * FROM ('
+        '  SELECT author_id, sum(sign) AS total, '
+        '  sum(CASE WHEN is_completed THEN sign ELSE 0 END) AS completed, '
+        '  sum(CASE WHEN priority = 1 THEN sign ELSE 0 END) AS priority_1, '
+        '  sum(CASE WHEN priority = 2 THEN sign ELSE 0 END) AS priority_2, '
+        '  sum(CASE WHEN priority = 3 THEN sign ELSE 0 END) AS priority_3, '
+        '  sum(CASE WHEN priority = 4 THEN sign ELSE 0 END) AS priority_4, '
+        '  sum(CASE WHEN priority = 5 THEN sign ELSE 0 END) AS priority_5 '
+        '  FROM (' || changes || ') c GROUP BY author_id'
+        ') d '
+        'WHERE total <> 0 OR completed <> 0 OR priority_1 <> 0 OR priority_2 <> 0 '
+        'OR priority_3 <> 0 OR priority_4 <> 0 OR priority_5 <> 0 '
+        'ON CONFLICT (author_id) DO UPDATE SET '
+        'total = s.total + excluded.total, '
+        'completed = s.completed + excluded.completed, '
+        'priority_1 = s.priority_1 + excluded.priority_1, '
+        'priority_2 = s.priority_2 + excluded.priority_2, '
+        'priority_3 = s.priority_3 + excluded.priority_3, '
+        'priority_4 = s.priority_4 + excluded.priority_4, '
+        'priority_5 = s.priority_5 + excluded.priority_5, '
+        'updated_at = now()';
+    RETURN NULL;
+END
+$$
+"""
+
+# join с tags отбрасывает теги, удалённые тем же оператором (каскад из tags)
+TAG_STATS_FUNCTION = """
+CREATE OR REPLACE FUNCTION tag_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    changes text;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT tag_id, 1 AS sign FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := 'SELECT tag_id, -1 AS sign FROM old_rows';
+    ELSE
+        changes := 'SELECT tag_id, 1 AS sign FROM new_rows '
+                   'UNION ALL SELECT tag_id, -1 FROM old_rows';
+    END IF;
+    EXECUTE
+        'INSERT INTO tag_stats AS s (tag_id, author_id, task_count) '
+        'SELECT * FROM ('
+        '  SELECT c.tag_id, tags.author_id, sum(c.sign) AS task_count '
+        '  FROM (' || changes || ') c JOIN tags ON tags.id = c.tag_id '
+        '  GROUP BY c.tag_id, tags.author_id'
+        ') d WHERE task_count <> 0 '
+        'ON CONFLICT (tag_id) DO UPDATE SET '
+        'task_count = s.task_count + excluded.task_count';
+    RETURN NULL;
+END
+$$
+"""
+
+# у триггера с transition tables может быть только одно событие
+TRIGGERS = [
+    ("tasks", "task_stats", "task_stats_apply", "INSERT", "NEW TABLE AS new_rows"),
+    ("tasks", "task_stats", "task_stats_apply", "UPDATE", "NEW TABLE AS new_rows OLD TABLE AS old_rows"),
+    ("tasks", "task_stats", "task_stats_apply", "DELETE", "OLD TABLE AS old_rows"),
+    ("task_tag", "tag_stats", "tag_stats_apply", "INSERT", "NEW TABLE AS new_rows"),
+    ("task_tag", "tag_stats", "tag_stats_apply", "UPDATE", "NEW TABLE AS new_rows OLD TABLE AS old_rows"),
+    ("task_tag", "tag_stats", "tag_stats_apply", "DELETE", "OLD TABLE AS old_rows"),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_stats',
+        sa.Column('author_id', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed', sa.Integer(), nullable=False, server_default='0'),
+        *(sa.Column(f'priority_{p}', sa.Integer(), nullable=False, server_default='0') for p in PRIORITIES),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('author_id'),
+    )
+    op.create_table(
+        'tag_stats',
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.Column('author_id', sa.Integer(), nullable=False),
+        sa.Column('task_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tag_id'),
+    )
+    op.create_index('ix_tag_stats_author_id', 'tag_stats', ['author_id'], unique=False)
+
+    op.execute(TASK_STATS_FUNCTION)
+    op.execute(TAG_STATS_FUNCTION)
+
+    # записи ждут конца миграции: триггеры и начальное заполнение видят одно и то же
+    op.execute("LOCK TABLE tasks, task_tag IN SHARE ROW EXCLUSIVE MODE")
+    for table, prefix, function, event, referencing in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {prefix}_{event.lower()} AFTER {event} ON {table} "
+            f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        )
+
+    op.execute(
+        "INSERT INTO task_stats (author_id, total, completed, "
+        + ", ".join(f"priority_{p}" for p in PRIORITIES)
+        + ") SELECT author_id, count(*), count(*) FILTER (WHERE is_completed), "
+        + ", ".join(f"count(*) FILTER (WHERE priority = {p})" for p in PRIORITIES)
+        + " FROM tasks GROUP BY author_id"
+    )
+    op.execute(
+        "INSERT INTO tag_stats (tag_id, author_id, task_count) "
+        "SELECT tags.id, tags.author_id, count(*) FROM task_tag "
+        "JOIN tags ON tags.id = task_tag.tag_id GROUP BY tags.id, tags.author_id"
+    )
+
+
+def downgrade() -> None:
+    for table, prefix, _, event, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {prefix}_{event.lower()} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS tag_stats_apply()")
+    op.execute("DROP FUNCTION IF EXISTS task_stats_apply()")
+    op.drop_index('ix_tag_stats_author_id', table_name='tag_stats')
+    op.drop_table('tag_stats')
+    op.drop_table('task_stats')
@@ -0,0 +1,44 @@
+"""add task search
+
+Revision ID: d30d7edb0660
+Revises: d7e415bb8cf0
+Create Date: 2026-10-18 10:02:17.804411
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd30d7edb0660'
+down_revision: Union[str, None] = 'd7e415bb8cf0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    # STORED-колонка перезаписывает таблицу один раз, дальше её поддерживает сама БД
+    op.add_column('tasks', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_author_id_search_vector', 'tasks', ['author_id', 'search_vector'], postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tasks_author_id_title_trgm', 'tasks', ['author_id', 'title'], postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_author_id_title_trgm', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_author_id_search_vector', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_column('tasks', 'search_vector')
@@ -0,0 +1,59 @@
+"""add query indexes
+
+Revision ID: d7e415bb8cf0
+Revises: 2f5ea9e1d5ce
+Create Date: 2026-10-18 09:10:41.512307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e415bb8cf0'
+down_revision: Union[str, None] = '2f5ea9e1d5ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+OPEN_DEADLINE_PREDICATE = "NOT is_completed AND deadline IS NOT NULL"
+
+
+def upgrade() -> None:
+    # task_tag без первичного ключа мог накопить дубли и NULL - чистим до уникального индекса
+    op.execute("DELETE FROM task_tag WHERE task_id IS NULL OR tag_id IS NULL")
+    op.execute(
+        "DELETE FROM task_tag a USING task_tag b "
+        "WHERE a.ctid < b.ctid AND a.task_id = b.task_id AND a.tag_id = b.tag_id"
+    )
+    op.alter_column('task_tag', 'task_id', existing_type=sa.Integer(), nullable=False)
+    op.alter_column('task_tag', 'tag_id', existing_type=sa.Integer(), nullable=False)
+
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_author_id_created_at', 'tasks', ['author_id', 'created_at'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tasks_author_id_deadline', 'tasks', ['author_id', 'deadline'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tasks_author_id_priority', 'tasks', ['author_id', 'priority'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tasks_author_id_open_deadline', 'tasks', ['author_id', 'deadline'], postgresql_where=sa.text(OPEN_DEADLINE_PREDICATE), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tags_author_id_name', 'tags', ['author_id', 'name'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_task_tag_tag_id', 'task_tag', ['tag_id'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('task_tag_pkey', 'task_tag', ['task_id', 'tag_id'], unique=True, postgresql_concurrently=True, if_not_exists=True)
+
+    op.execute("ALTER TABLE task_tag ADD CONSTRAINT task_tag_pkey PRIMARY KEY USING INDEX task_tag_pkey")
+
+
+def downgrade() -> None:
+    op.drop_constraint('task_tag_pkey', 'task_tag', type_='primary')
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_task_tag_tag_id', table_name='task_tag', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tags_author_id_name', table_name='tags', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_author_id_open_deadline', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_author_id_priority', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_author_id_deadline', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_author_id_created_at', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+
+    op.alter_column('task_tag', 'tag_id', existing_type=sa.Integer(), nullable=True)
+    op.alter_column('task_tag', 'task_id', existing_type=sa.Integer(), nullable=True)
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, func
+from src.db.base import Base
+
+# колонка task_stats со счётчиком задач каждого приоритета
+PRIORITIES = range(1, 6)
+
+
+class TaskStats(Base):
+    """Счётчики задач автора.
+
+    Поддерживаются триггерами на tasks (миграция 8b2d4f6a1c37), поэтому
+    учитывают любые записи, включая bulk-операции и импорт через COPY.
+    Расхождения чинит src/jobs/reconcile_stats.py.
+    """
+
+    __tablename__ = "task_stats"
+
+    author_id = Column(Integer, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    priority_1 = Column(Integer, nullable=False, default=0)
+    priority_2 = Column(Integer, nullable=False, default=0)
+    priority_3 = Column(Integer, nullable=False, default=0)
+    priority_4 = Column(Integer, nullable=False, default=0)
+    priority_5 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class TagStats(Base):
+    """Число задач с тегом; поддерживается триггерами на task_tag."""
+
+    __tablename__ = "tag_stats"
+
+    tag_id = Column(
+        Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
+    )
+    author_id = Column(Integer, nullable=False)
+    task_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_tag_stats_author_id", "author_id"),)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 from src.db.base import Base
 
 
@@ -8,3 +8,8 @@ class Tag(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     author_id = Column(Integer, nullable=False)
+
+    # по нему же работает get-or-create тегов по имени (ON CONFLICT)
+    __table_args__ = (
+        Index("uq_tags_author_id_name", "author_id", "name", unique=True),
+    )
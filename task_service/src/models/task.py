@@ -1,6 +1,17 @@
 from datetime import UTC, datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from src.db.base import Base
 from src.models.task_tag import task_tag_table
@@ -18,4 +29,42 @@ class Task(Base):
     deadline = Column(DateTime(timezone=True), nullable=True)
     is_completed = Column(Boolean, default=False)
     author_id = Column(Integer, nullable=False)
-    tags = relationship(Tag, secondary=task_tag_table, backref="tasks", lazy="selectin")
+    # поддерживается БД, в обычных запросах не выбирается
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
+    # теги загружаются только явно (selectinload / attach_tags)
+    tags = relationship(Tag, secondary=task_tag_table, backref="tasks", lazy="raise")
+
+    __table_args__ = (
+        Index("ix_tasks_author_id_created_at", "author_id", "created_at"),
+        Index("ix_tasks_author_id_deadline", "author_id", "deadline"),
+        Index("ix_tasks_author_id_priority", "author_id", "priority"),
+        # для get_overdue_tasks_db: только незавершённые задачи с дедлайном
+        Index(
+            "ix_tasks_author_id_open_deadline",
+            "author_id",
+            "deadline",
+            postgresql_where=text("NOT is_completed AND deadline IS NOT NULL"),
+        ),
+        Index(
+            "ix_tasks_author_id_search_vector",
+            "author_id",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_tasks_author_id_title_trgm",
+            "author_id",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
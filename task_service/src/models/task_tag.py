@@ -1,9 +1,14 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Index, Integer, ForeignKey
 from src.db.base import Base
 
 task_tag_table = Table(
     "task_tag",
     Base.metadata,
-    Column("task_id", Integer, ForeignKey("tasks.id", ondelete="CASCADE")),
-    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE")),
+    Column(
+        "task_id", Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    ),
+    Column(
+        "tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
+    ),
+    Index("ix_task_tag_tag_id", "tag_id"),
 )
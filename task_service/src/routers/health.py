@@ -0,0 +1,31 @@
+from fastapi import APIRouter, status
+
+from src.core.auth_client import breaker, pool_config
+from src.core.query_cache import query_cache
+from src.core.security import jwks
+from src.dependencies.auth import user_cache
+
+router = APIRouter()
+
+
+@router.get(
+    "/auth",
+    status_code=status.HTTP_200_OK,
+    summary="Настройки пула соединений и состояние circuit breaker для auth_service",
+)
+async def auth_health():
+    return {
+        "pool": pool_config(),
+        "circuit_breaker": breaker.snapshot(),
+        "user_cache_size": len(user_cache),
+        "jwks_keys": len(jwks),
+    }
+
+
+@router.get(
+    "/cache",
+    status_code=status.HTTP_200_OK,
+    summary="Статистика кэша ответов чтения",
+)
+async def cache_health():
+    return query_cache.stats()
@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from src.schemas.task import TaskResponse
+from typing import Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from src.core.pagination import next_cursor
+from src.core.query_cache import cached_json_response
+from src.core.serialization import task_list_response
+from src.schemas.task import (
+    TaskFieldsPage,
+    TaskFieldsResponse,
+    TaskNormalizedPage,
+    TaskPage,
+    TaskResponse,
+)
 from src.dependencies.auth import get_current_user
-from src.db.session import get_session
-from src.schemas.tag import TagCreate, TagResponse, TagUpdate
+from src.dependencies.fields import task_fields, task_shape
+from src.db.session import get_read_session, get_session
+from src.schemas.tag import TagCreate, TagPage, TagResponse, TagUpdate
 from src.crud.tag import *
 
 router = APIRouter()
@@ -26,18 +38,43 @@ async def create_tag(
 
 @router.get(
     "/",
-    response_model=Sequence[TagResponse],
+    response_model=Union[Sequence[TagResponse], TagPage],
     status_code=status.HTTP_201_CREATED,
     summary="Получить все теги текущего пользователя",
 )
 async def get_all_tasks(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор keyset-пагинации (пустая строка - первая страница), "
+        "ответ придёт в виде {items, next_cursor}",
+    ),
     current_user: dict = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    tags = await get_all_tags_by_author_id(session, current_user["id"], skip, limit)
-    return tags
+    async def load():
+        tags = await get_all_tags_by_author_id(
+            session, current_user["id"], skip, limit, cursor
+        )
+        items = [TagResponse.model_validate(tag).model_dump() for tag in tags]
+        if cursor is None:
+            return items
+        return {
+            "items": items,
+            "next_cursor": next_cursor(tags, limit, TAG_LIST_CURSOR_KIND),
+        }
+
+    params = {"skip": skip, "limit": limit, "cursor": cursor}
+    return await cached_json_response(
+        request,
+        current_user["id"],
+        "tags",
+        params,
+        load,
+        status_code=status.HTTP_201_CREATED,
+    )
 
 
 @router.get("/{tag_id:int}", response_model=TagResponse, summary="Получить тег по ID")
@@ -94,7 +131,13 @@ async def search_tags(
 
 @router.get(
     "/{tag_id:int}/tasks",
-    response_model=Sequence[TaskResponse],
+    response_model=Union[
+        Sequence[TaskResponse],
+        TaskPage,
+        Sequence[TaskFieldsResponse],
+        TaskFieldsPage,
+        TaskNormalizedPage,
+    ],
     summary="Получить все задачи по тегу",
 )
 async def get_tasks_by_tag(
@@ -102,8 +145,20 @@ async def get_tasks_by_tag(
     is_complited: bool | None = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор keyset-пагинации (пустая строка - первая страница), "
+        "ответ придёт в виде {items, next_cursor}",
+    ),
+    fields: List[str] = Depends(task_fields),
+    shape: str = Depends(task_shape),
     current_user: dict = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
-    tasks = await get_tasks_for_tag(session, tag_id, current_user["id"], is_complited, skip, limit)
-    return tasks
+    tasks = await get_tasks_for_tag(
+        session, tag_id, current_user["id"], is_complited, skip, limit, cursor, fields
+    )
+    if cursor is None:
+        return task_list_response(tasks, shape)
+    page = next_cursor(tasks, limit, tag_tasks_cursor_kind(tag_id))
+    return task_list_response(tasks, shape, paginated=True, next_cursor=page)
@@ -1,15 +1,67 @@
+import logging
+import time
 from datetime import date
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
 
-from src.db.session import get_session
+from src.db.session import get_read_session, get_session, open_read_session
 from src.dependencies.auth import get_current_user
-from src.schemas.task import DeadlineShiftRequest, TaskCreate, TaskResponse, TaskUpdate
+from src.dependencies.fields import task_fields, task_shape
+from src.core.config import (
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_LIMIT,
+    TASK_EXPORT_BATCH_SIZE,
+    TASK_IMPORT_BATCH_SIZE,
+    TASK_IMPORT_MAX_ERRORS,
+)
+from src.core.import_stream import IMPORT_PARSERS, ImportFormatError
+from src.core.pagination import next_cursor
+from src.core.query_cache import cached_json_response, query_cache
+from src.core.serialization import (
+    csv_lines,
+    ndjson_lines,
+    task_list_content,
+    task_list_response,
+)
+from src.schemas.task import (
+    BulkCompleteRequest,
+    BulkCountResponse,
+    BulkDeadlineShiftRequest,
+    BulkItemResult,
+    DeadlineShiftRequest,
+    TagsChangeResult,
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkUpdateRequest,
+    TaskCreate,
+    TaskFieldsPage,
+    TaskFieldsResponse,
+    TaskImportError,
+    TaskImportProgress,
+    TaskImportReport,
+    TaskImportRow,
+    TaskStatsResponse,
+    TaskNormalizedPage,
+    TaskPage,
+    TaskResponse,
+    TasksTagsChange,
+    TaskUpdate,
+)
 from src.schemas.tag import TagResponse
 from src.crud.task import *
+from src.crud.stats import get_task_stats
+from src.crud.task_fields import ALL_TASK_FIELDS, TAGS_FIELD
+from src.crud.task_import import (
+    finish_task_import,
+    import_tasks_batch,
+    start_task_import,
+)
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 @router.post(
@@ -27,13 +79,197 @@ async def create_task(
     return task
 
 
+@router.post(
+    "/bulk",
+    response_model=List[BulkItemResult],
+    status_code=status.HTTP_201_CREATED,
+    summary="Создать задачи пачкой",
+)
+async def create_tasks(
+    bulk: TaskBulkCreate,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    task_ids = await create_tasks_bulk(session, bulk.items, current_user["id"])
+    return [
+        BulkItemResult(index=index, id=task_id, status="created")
+        for index, task_id in enumerate(task_ids)
+    ]
+
+
+@router.patch(
+    "/bulk",
+    response_model=List[BulkItemResult],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Обновить задачи пачкой",
+)
+async def update_tasks(
+    bulk: TaskBulkUpdateRequest,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    updated_ids = set(await update_tasks_bulk(session, bulk.items, current_user["id"]))
+    return [
+        BulkItemResult(
+            index=index,
+            id=item.id,
+            status="updated" if item.id in updated_ids else "not_found",
+        )
+        for index, item in enumerate(bulk.items)
+    ]
+
+
+@router.delete(
+    "/bulk",
+    response_model=List[BulkItemResult],
+    status_code=status.HTTP_200_OK,
+    summary="Удалить задачи пачкой",
+)
+async def delete_tasks(
+    bulk: TaskBulkDelete,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    deleted_ids = set(await delete_tasks_bulk(session, bulk.ids, current_user["id"]))
+    return [
+        BulkItemResult(
+            index=index,
+            id=task_id,
+            status="deleted" if task_id in deleted_ids else "not_found",
+        )
+        for index, task_id in enumerate(bulk.ids)
+    ]
+
+
+BULK_IDS_CHUNK_SIZE = 1000
+
+# основной ответ - NDJSON; BulkCountResponse из response_model - только при dry_run
+BULK_IDS_RESPONSES = {
+    200: {
+        "description": 'NDJSON: по строке {"id": ...} на каждую изменённую задачу; '
+        "при dry_run=true - JSON BulkCountResponse",
+        "headers": {
+            "X-Affected-Count": {
+                "description": "Число изменённых задач (без dry_run)",
+                "schema": {"type": "integer"},
+            }
+        },
+        "content": {
+            "application/x-ndjson": {
+                "schema": {"type": "string"},
+                "example": '{"id": 1}\n{"id": 2}\n',
+            }
+        },
+    }
+}
+
+
+async def _stream_ids(task_ids: List[int]):
+    for start in range(0, len(task_ids), BULK_IDS_CHUNK_SIZE):
+        chunk = task_ids[start : start + BULK_IDS_CHUNK_SIZE]
+        yield "".join(f'{{"id": {task_id}}}\n' for task_id in chunk)
+
+
+def _ids_response(task_ids: List[int]) -> StreamingResponse:
+    """NDJSON со списком id, отдаваемый частями по BULK_IDS_CHUNK_SIZE.
+
+    Частями идёт только вывод: список id целиком получен из UPDATE ...
+    RETURNING до коммита. Читать RETURNING потоком нельзя - ответ начался бы
+    до того, как изменения закоммичены, и X-Affected-Count был бы неизвестен.
+    """
+    return StreamingResponse(
+        _stream_ids(task_ids),
+        media_type="application/x-ndjson",
+        headers={"X-Affected-Count": str(len(task_ids))},
+    )
+
+
+@router.post(
+    "/bulk/shift_deadline",
+    response_model=BulkCountResponse,
+    responses=BULK_IDS_RESPONSES,
+    status_code=status.HTTP_200_OK,
+    summary="Перенести дедлайн задач по фильтру",
+    description="Возвращает NDJSON с id перенесённых задач, "
+    "при dry_run=true - только их количество",
+)
+async def shift_tasks_deadline(
+    shift_data: BulkDeadlineShiftRequest,
+    dry_run: bool = False,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    if dry_run:
+        count = await count_tasks_to_shift(
+            session, current_user["id"], shift_data.filter
+        )
+        return BulkCountResponse(count=count)
+    shift = timedelta(
+        days=shift_data.days, hours=shift_data.hours, minutes=shift_data.minutes
+    )
+    task_ids = await shift_tasks_deadline_by_filter(
+        session, current_user["id"], shift_data.filter, shift
+    )
+    return _ids_response(task_ids)
+
+
+@router.post(
+    "/bulk/complete",
+    response_model=BulkCountResponse,
+    responses=BULK_IDS_RESPONSES,
+    status_code=status.HTTP_200_OK,
+    summary="Пометить выполненными задачи по фильтру",
+    description="Возвращает NDJSON с id выполненных задач, "
+    "при dry_run=true - только их количество",
+)
+async def complete_tasks(
+    complete_data: BulkCompleteRequest,
+    dry_run: bool = False,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    if dry_run:
+        count = await count_tasks_to_complete(
+            session, current_user["id"], complete_data.filter
+        )
+        return BulkCountResponse(count=count)
+    task_ids = await complete_tasks_by_filter(
+        session, current_user["id"], complete_data.filter
+    )
+    return _ids_response(task_ids)
+
+
+@router.post(
+    "/bulk/tags",
+    response_model=TagsChangeResult,
+    status_code=status.HTTP_200_OK,
+    summary="Добавить, снять или заменить тэги у многих задач",
+)
+async def change_tags_of_tasks(
+    change: TasksTagsChange,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    added, removed = await change_tasks_tags(
+        session, current_user["id"], change.task_ids, change.tag_ids, change.operation
+    )
+    return TagsChangeResult(added=added, removed=removed)
+
+
 @router.get(
     "/",
-    response_model=Sequence[TaskResponse],
+    response_model=Union[
+        Sequence[TaskResponse],
+        TaskPage,
+        Sequence[TaskFieldsResponse],
+        TaskFieldsPage,
+        TaskNormalizedPage,
+    ],
     status_code=status.HTTP_200_OK,
     summary="Получить все задачи текущего пользователя с сортировкой",
 )
 async def get_all_tasks(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     is_completed: Optional[bool] = Query(
@@ -47,13 +283,182 @@ async def get_all_tasks(
     order: str = Query(
         "desc", description="Порядок сортировки (asc или desc)", regex="^(asc|desc)$"
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор keyset-пагинации (пустая строка - первая страница), "
+        "ответ придёт в виде {items, next_cursor}",
+    ),
+    fields: List[str] = Depends(task_fields),
+    shape: str = Depends(task_shape),
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    async def load():
+        tasks = await get_all_tasks_by_author_id(
+            session,
+            current_user["id"],
+            skip,
+            limit,
+            is_completed,
+            sort_by,
+            order,
+            cursor,
+            fields,
+        )
+        if cursor is None:
+            return task_list_content(tasks, shape)
+        kind = task_list_cursor_kind(sort_by, order)
+        page = next_cursor(tasks, limit, kind, sort_by)
+        return task_list_content(tasks, shape, paginated=True, next_cursor=page)
+
+    params = {
+        "skip": skip,
+        "limit": limit,
+        "is_completed": is_completed,
+        "sort_by": sort_by,
+        "order": order,
+        "cursor": cursor,
+        "fields": fields,
+        "shape": shape,
+    }
+    return await cached_json_response(
+        request, current_user["id"], "tasks", params, load
+    )
+
+
+@router.post(
+    "/import",
+    response_model=TaskImportReport,
+    status_code=status.HTTP_200_OK,
+    summary="Импортировать задачи из NDJSON или CSV",
+)
+async def import_tasks(
+    request: Request,
+    format: str = Query(
+        "ndjson", description="Формат тела (ndjson или csv)", regex="^(ndjson|csv)$"
+    ),
     current_user: dict = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
-    tasks = await get_all_tasks_by_author_id(
-        session, current_user["id"], skip, limit, is_completed, sort_by, order
+    """Тело читается потоком и грузится пачками через COPY одной транзакцией.
+
+    Строки с ошибками пропускаются и перечисляются в отчёте (не больше
+    TASK_IMPORT_MAX_ERRORS); ошибка формата всего тела отменяет импорт.
+    """
+    author_id = current_user["id"]
+    started = time.monotonic()
+    progress: List[TaskImportProgress] = []
+    errors: List[TaskImportError] = []
+    rows_read = imported = failed = 0
+    batch: List[TaskImportRow] = []
+
+    def row_failed(row: int, messages: List[str]) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < TASK_IMPORT_MAX_ERRORS:
+            errors.append(TaskImportError(row=row, errors=messages))
+
+    async def flush() -> None:
+        nonlocal imported
+        imported += await import_tasks_batch(session, connection, author_id, batch)
+        batch.clear()
+        progress.append(
+            TaskImportProgress(
+                batch=len(progress) + 1,
+                rows=rows_read,
+                imported=imported,
+                failed=failed,
+                elapsed_seconds=round(time.monotonic() - started, 3),
+            )
+        )
+        logger.info("task import author=%s: %s", author_id, progress[-1])
+
+    connection = await start_task_import(session)
+    try:
+        async for row, record in IMPORT_PARSERS[format](request.stream()):
+            rows_read = row
+            if isinstance(record, str):
+                row_failed(row, [record])
+                continue
+            try:
+                batch.append(TaskImportRow.model_validate(record))
+            except ValidationError as exc:
+                row_failed(
+                    row,
+                    [
+                        f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                        for error in exc.errors()
+                    ],
+                )
+                continue
+            if len(batch) >= TASK_IMPORT_BATCH_SIZE:
+                await flush()
+        if batch or not progress:
+            await flush()
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    await finish_task_import(session, author_id)
+
+    return TaskImportReport(
+        imported=imported,
+        failed=failed,
+        progress=progress,
+        errors=errors,
+        errors_truncated=failed > len(errors),
+    )
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Выгрузить все задачи текущего пользователя в NDJSON или CSV",
+)
+async def export_tasks(
+    format: str = Query(
+        "ndjson", description="Формат выгрузки (ndjson или csv)", regex="^(ndjson|csv)$"
+    ),
+    is_completed: Optional[bool] = Query(
+        None, description="Фильтр по статусу выполнения"
+    ),
+    sort_by: str = Query(
+        "created_at",
+        description="Поле для сортировки (title, priority, deadline, created_at)",
+        regex="^(title|priority|deadline|created_at)$",
+    ),
+    order: str = Query(
+        "desc", description="Порядок сортировки (asc или desc)", regex="^(asc|desc)$"
+    ),
+    current_user: dict = Depends(get_current_user),
+):
+    author_id = current_user["id"]
+    version = await query_cache.version(author_id)
+
+    # сессия открывается в самом генераторе: зависимости с yield закрываются
+    # до того, как StreamingResponse начнёт отдавать тело
+    async def body():
+        async with await open_read_session(author_id, version) as session:
+            if format == "csv":
+                yield csv_lines([], ALL_TASK_FIELDS, header=True)
+            async for tasks in stream_tasks_for_export(
+                session, author_id, is_completed, sort_by, order, TASK_EXPORT_BATCH_SIZE
+            ):
+                if format == "ndjson":
+                    yield ndjson_lines(tasks)
+                    continue
+                # в CSV у тегов только имена - в том же виде их принимает импорт
+                for task in tasks:
+                    task[TAGS_FIELD] = [tag["name"] for tag in task[TAGS_FIELD]]
+                yield csv_lines(tasks, ALL_TASK_FIELDS)
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
     )
-    return tasks
 
 
 @router.get(
@@ -140,15 +545,44 @@ async def get_task_tags(
 
 
 @router.get(
-    "/search/", response_model=Sequence[TaskResponse], summary="Поиск задач по названию"
+    "/search/",
+    response_model=Union[
+        Sequence[TaskResponse],
+        TaskPage,
+        Sequence[TaskFieldsResponse],
+        TaskFieldsPage,
+        TaskNormalizedPage,
+    ],
+    summary="Поиск задач по названию и описанию",
 )
 async def search_tasks(
-    title: str,
+    title: str = Query(..., min_length=1, description="Строка поиска"),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор keyset-пагинации (пустая строка - первая страница), "
+        "ответ придёт в виде {items, next_cursor}",
+    ),
+    fields: List[str] = Depends(task_fields),
+    shape: str = Depends(task_shape),
     current_user: dict = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    tasks = await search_tasks_by_title(session, title, current_user["id"])
-    return tasks
+    tasks, next_page = await search_tasks_db(
+        session, current_user["id"], title, limit, cursor, fields
+    )
+    return task_list_response(
+        tasks, shape, paginated=cursor is not None, next_cursor=next_page
+    )
+
+
+async def _change_task_tags(
+    task_id: int, tags_ids: List[int], operation: str, user_id: int, session
+):
+    task = await update_tags_task_by_id(session, task_id, user_id, tags_ids, operation)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
 
 
 @router.patch(
@@ -163,52 +597,132 @@ async def update_tags_task(
     current_user: dict = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
+    return await _change_task_tags(
+        task_id, tags_ids, "add", current_user["id"], session
+    )
 
-    task = await update_tags_task_by_id(session, task_id, current_user["id"], tags_ids)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    return task
+
+@router.patch(
+    "/{task_id:int}/remove_tags",
+    response_model=TaskResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Снять тэги с задачи",
+)
+async def remove_tags_task(
+    task_id: int,
+    tags_ids: List[int],
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    return await _change_task_tags(
+        task_id, tags_ids, "remove", current_user["id"], session
+    )
+
+
+@router.put(
+    "/{task_id:int}/tags",
+    response_model=TaskResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Заменить тэги задачи",
+)
+async def replace_tags_task(
+    task_id: int,
+    tags_ids: List[int],
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    return await _change_task_tags(
+        task_id, tags_ids, "replace", current_user["id"], session
+    )
+
+
+async def _tasks_by_deadline_response(
+    request: Request,
+    session: AsyncSession,
+    author_id: int,
+    day_start: date,
+    day_end: date,
+    is_completed: Optional[bool],
+    fields: List[str],
+    shape: str,
+):
+    async def load():
+        tasks = await get_tasks_by_deadline_period(
+            session, author_id, day_start, day_end, is_completed, fields
+        )
+        return task_list_content(tasks, shape)
+
+    params = {
+        "day_start": day_start,
+        "day_end": day_end,
+        "is_completed": is_completed,
+        "fields": fields,
+        "shape": shape,
+    }
+    return await cached_json_response(request, author_id, "by-deadline", params, load)
 
 
 @router.get(
     "/by-deadline",
-    response_model=List[TaskResponse],
+    response_model=Union[
+        List[TaskResponse], List[TaskFieldsResponse], TaskNormalizedPage
+    ],
     status_code=status.HTTP_200_OK,
     summary="Получить задачи с дедлайном в указанный промежуток",
 )
 async def get_tasks_by_deadline_interval(
+    request: Request,
     day_start: date,
     day_end: date,
     is_completed: Optional[bool] = Query(
         None, description="Фильтр по статусу выполнения"
     ),
+    fields: List[str] = Depends(task_fields),
+    shape: str = Depends(task_shape),
     current_user: dict = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    tasks = await get_tasks_by_deadline_period(
-        session, current_user["id"], day_start, day_end, is_completed
+    return await _tasks_by_deadline_response(
+        request,
+        session,
+        current_user["id"],
+        day_start,
+        day_end,
+        is_completed,
+        fields,
+        shape,
     )
-    return tasks
 
 
 @router.get(
     "/by-deadline/{day}",
-    response_model=List[TaskResponse],
+    response_model=Union[
+        List[TaskResponse], List[TaskFieldsResponse], TaskNormalizedPage
+    ],
     status_code=status.HTTP_200_OK,
     summary="Получить задачи с дедлайном в указанный день",
 )
 async def get_tasks_by_deadline(
+    request: Request,
     day: date,
     is_completed: Optional[bool] = Query(
         None, description="Фильтр по статусу выполнения"
     ),
+    fields: List[str] = Depends(task_fields),
+    shape: str = Depends(task_shape),
     current_user: dict = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    tasks = await get_tasks_by_deadline_period(
-        session, current_user["id"], day, day, is_completed
+    return await _tasks_by_deadline_response(
+        request,
+        session,
+        current_user["id"],
+        day,
+        day,
+        is_completed,
+        fields,
+        shape,
     )
-    return tasks
 
 
 @router.patch(
@@ -236,14 +750,68 @@ async def shift_task_deadline(
 
 @router.get(
     "/overdue",
-    response_model=Sequence[TaskResponse],
+    response_model=Union[
+        Sequence[TaskResponse],
+        TaskPage,
+        Sequence[TaskFieldsResponse],
+        TaskFieldsPage,
+        TaskNormalizedPage,
+    ],
     summary="Получить просроченные задачи",
 )
 async def get_overdue_tasks(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор keyset-пагинации (пустая строка - первая страница), "
+        "ответ придёт в виде {items, next_cursor}",
+    ),
+    fields: List[str] = Depends(task_fields),
+    shape: str = Depends(task_shape),
     current_user: dict = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+):
+    async def load():
+        tasks = await get_overdue_tasks_db(
+            session, current_user["id"], skip, limit, cursor, fields
+        )
+        if cursor is None:
+            return task_list_content(tasks, shape)
+        page = next_cursor(tasks, limit, OVERDUE_CURSOR_KIND, "deadline")
+        return task_list_content(tasks, shape, paginated=True, next_cursor=page)
+
+    # «просроченность» зависит и от времени, поэтому задача может попасть
+    # в ответ с опозданием не больше QUERY_CACHE_TTL_SECONDS; ETag здесь
+    # не отдаём - версия данных не меняется, когда задача становится просроченной
+    params = {
+        "skip": skip,
+        "limit": limit,
+        "cursor": cursor,
+        "fields": fields,
+        "shape": shape,
+    }
+    return await cached_json_response(
+        request, current_user["id"], "overdue", params, load, etag=False
+    )
+
+
+@router.get(
+    "/stats",
+    response_model=TaskStatsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Счётчики задач текущего пользователя по статусу, приоритетам и тегам",
+)
+async def get_tasks_stats(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    tasks = await get_overdue_tasks_db(session, current_user["id"], skip, limit)
-    return tasks
+    async def load():
+        return await get_task_stats(session, current_user["id"])
+
+    # overdue зависит от времени, поэтому без ETag - как и у /overdue
+    return await cached_json_response(
+        request, current_user["id"], "stats", {}, load, etag=False
+    )
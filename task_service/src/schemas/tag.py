@@ -1,9 +1,14 @@
-from typing import List, Optional
-from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, List, Optional
+from pydantic import BaseModel, ConfigDict, StringConstraints
+
+
+TagName = Annotated[
+    str, StringConstraints(strip_whitespace=True, min_length=1, max_length=100)
+]
 
 
 class TagCreate(BaseModel):
-    name: str = Field(..., max_length=100)
+    name: TagName
 
 
 class TagResponse(BaseModel):
@@ -14,5 +19,10 @@ class TagResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TagPage(BaseModel):
+    items: List[TagResponse]
+    next_cursor: Optional[str] = None
+
+
 class TagUpdate(BaseModel):
-    name: Optional[str] = Field(None, max_length=100)
+    name: Optional[TagName] = None
@@ -1,9 +1,12 @@
-from datetime import UTC, datetime
-from typing import List, Optional
+import json
+from datetime import UTC, date, datetime
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
-from src.schemas.tag import TagResponse
+from src.core.config import TASK_BULK_MAX_ITEMS, TASK_TAGS_MAX_TASKS
+
+from src.schemas.tag import TagName, TagResponse
 
 
 class TaskCreate(BaseModel):
@@ -12,6 +15,9 @@ class TaskCreate(BaseModel):
     priority: int = Field(3, ge=1, le=5)
     deadline: Optional[datetime] = Field(None)
     tags: List[TagResponse] = Field(default_factory=list)
+    tag_names: List[TagName] = Field(
+        default_factory=list, description="Имена тегов, недостающие будут созданы"
+    )
 
     @field_validator("deadline")
     @classmethod
@@ -42,6 +48,45 @@ class TaskResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True, arbitrary_types_allowed=True)
 
 
+class TaskPage(BaseModel):
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+
+class TaskFieldsBase(BaseModel):
+    """Задача, выбранная с fields=...: незапрошенных полей в ответе нет."""
+
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    priority: Optional[int] = None
+    created_at: Optional[datetime] = None
+    deadline: Optional[datetime] = None
+    is_completed: Optional[bool] = None
+    author_id: Optional[int] = None
+
+
+class TaskFieldsResponse(TaskFieldsBase):
+    tags: Optional[List[TagResponse]] = None
+
+
+class TaskFieldsPage(BaseModel):
+    items: List[TaskFieldsResponse]
+    next_cursor: Optional[str] = None
+
+
+class TaskNormalizedResponse(TaskFieldsBase):
+    tag_ids: List[int]
+
+
+class TaskNormalizedPage(BaseModel):
+    """shape=normalized: каждый тег один раз в tags, задачи ссылаются на него по id."""
+
+    items: List[TaskNormalizedResponse]
+    tags: Dict[str, TagResponse]
+    next_cursor: Optional[str] = None
+
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=1000)
@@ -49,6 +94,13 @@ class TaskUpdate(BaseModel):
     deadline: Optional[datetime] = None
     is_completed: Optional[bool] = None
     tag_ids: Optional[List[int]] = None
+    tag_names: Optional[List[TagName]] = Field(
+        None, description="Имена тегов, недостающие будут созданы"
+    )
+
+    @property
+    def replaces_tags(self) -> bool:
+        return self.tag_ids is not None or self.tag_names is not None
 
     @field_validator("deadline")
     @classmethod
@@ -64,7 +116,169 @@ class TaskUpdate(BaseModel):
                 raise ValueError("Deadline must be in the future")
         return value
 
+
 class DeadlineShiftRequest(BaseModel):
     days: int = Field(0, description="Дней для переноса")
     hours: int = Field(0, description="Часов для переноса")
-    minutes: int = Field(0, description="Минут для переноса")
\ No newline at end of file
+    minutes: int = Field(0, description="Минут для переноса")
+
+
+class TaskBulkCreate(BaseModel):
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=TASK_BULK_MAX_ITEMS)
+
+
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBulkUpdateRequest(BaseModel):
+    items: List[TaskBulkUpdate] = Field(
+        ..., min_length=1, max_length=TASK_BULK_MAX_ITEMS
+    )
+
+    @field_validator("items")
+    @classmethod
+    def validate_unique_ids(cls, value: List[TaskBulkUpdate]) -> List[TaskBulkUpdate]:
+        if len({item.id for item in value}) != len(value):
+            raise ValueError("Task ids must be unique")
+        return value
+
+
+class TaskBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=TASK_BULK_MAX_ITEMS)
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int]
+    status: str
+
+
+class TaskFilter(BaseModel):
+    day_start: Optional[date] = Field(None, description="Дедлайн не раньше этого дня")
+    day_end: Optional[date] = Field(None, description="Дедлайн не позже этого дня")
+    tag_id: Optional[int] = Field(None, description="Только задачи с этим тегом")
+    is_completed: Optional[bool] = Field(None, description="Статус выполнения")
+    all: bool = Field(
+        False, description="Подтверждение, что фильтр без условий берёт все задачи"
+    )
+
+    @model_validator(mode="after")
+    def validate_period(self) -> "TaskFilter":
+        if self.day_start and self.day_end and self.day_start > self.day_end:
+            raise ValueError("day_start must not be after day_end")
+        return self
+
+    @model_validator(mode="after")
+    def validate_not_empty(self) -> "TaskFilter":
+        # пустое тело не должно молча менять все задачи автора
+        criteria = (self.day_start, self.day_end, self.tag_id, self.is_completed)
+        if not self.all and not any(value is not None for value in criteria):
+            raise ValueError("Filter must have at least one condition or all=true")
+        return self
+
+
+class BulkDeadlineShiftRequest(DeadlineShiftRequest):
+    filter: TaskFilter
+
+
+class BulkCompleteRequest(BaseModel):
+    filter: TaskFilter
+
+
+class BulkCountResponse(BaseModel):
+    count: int
+
+
+TagsOperation = Literal["add", "remove", "replace"]
+
+
+class TasksTagsChange(BaseModel):
+    task_ids: List[int] = Field(..., min_length=1, max_length=TASK_TAGS_MAX_TASKS)
+    tag_ids: List[int] = Field(default_factory=list)
+    operation: TagsOperation = Field(
+        "add", description="add - добавить, remove - снять, replace - заменить"
+    )
+
+
+class TagsChangeResult(BaseModel):
+    added: int
+    removed: int
+
+
+class TaskImportRow(BaseModel):
+    """Строка импорта: поля как у TaskCreate, но дедлайн может быть в прошлом.
+
+    tags - имена тегов; принимаются и объекты {"name": ...} из выгрузки,
+    и JSON-массив строкой (колонка tags в CSV). Прочие поля (id, author_id)
+    игнорируются.
+    """
+
+    title: str = Field(..., min_length=1, max_length=100)
+    description: Optional[str] = Field(None, max_length=1000)
+    priority: int = Field(3, ge=1, le=5)
+    deadline: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    is_completed: bool = False
+    tags: List[TagName] = Field(default_factory=list)
+
+    @field_validator("deadline", "created_at")
+    @classmethod
+    def validate_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=UTC)
+        return value.astimezone(UTC)
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def parse_tags(cls, value: Any) -> Any:
+        # здесь только приводим к списку имён; не-строки отклонит List[TagName]
+        if isinstance(value, str):
+            value = json.loads(value) if value.strip() else []
+        if isinstance(value, list):
+            value = [tag.get("name") if isinstance(tag, dict) else tag for tag in value]
+        return value
+
+    @field_validator("tags")
+    @classmethod
+    def dedupe_tags(cls, value: List[str]) -> List[str]:
+        # повторы одного тега в строке не нужны; имена здесь уже без пробелов
+        return list(dict.fromkeys(value))
+
+
+class TaskImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class TaskImportProgress(BaseModel):
+    batch: int
+    rows: int
+    imported: int
+    failed: int
+    elapsed_seconds: float
+
+
+class TaskImportReport(BaseModel):
+    imported: int
+    failed: int
+    progress: List[TaskImportProgress]
+    errors: List[TaskImportError]
+    errors_truncated: bool
+
+
+class TagTaskCount(BaseModel):
+    id: int
+    name: str
+    task_count: int
+
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    completed: int
+    open: int
+    overdue: int
+    by_priority: Dict[str, int]
+    tags: List[TagTaskCount]
@@ -0,0 +1,330 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+
+from src.core.pagination import next_cursor
+from src.crud.tag import create_tag_db
+from src.crud.task import (
+    _as_utc,
+    change_tasks_tags,
+    create_tasks_bulk,
+    delete_tasks_bulk,
+    get_all_tasks_by_author_id,
+    get_task_by_id,
+    task_list_cursor_kind,
+    update_task_by_id,
+    update_tasks_bulk,
+)
+from src.crud.task_fields import tags_by_task
+from src.models.task import Task
+from src.routers.task import (
+    complete_tasks,
+    delete_tasks,
+    update_tasks,
+)
+from src.schemas.task import (
+    BulkCompleteRequest,
+    BulkCountResponse,
+    TaskBulkDelete,
+    TaskBulkUpdateRequest,
+    TaskCreate,
+    TaskUpdate,
+)
+
+AUTHOR = {"id": 1}
+OTHER_AUTHOR = {"id": 2}
+
+
+async def _titles(session, task_ids):
+    rows = await session.execute(
+        select(Task.id, Task.title).where(Task.id.in_(task_ids))
+    )
+    return dict(rows.all())
+
+
+async def test_bulk_create_returns_ids_in_item_order(session):
+    items = [
+        TaskCreate(title=f"t{i}", tag_names=["a"] if i % 2 else []) for i in range(5)
+    ]
+    task_ids = await create_tasks_bulk(session, items, AUTHOR["id"])
+
+    assert len(task_ids) == 5
+    titles = await _titles(session, task_ids)
+    assert [titles[task_id] for task_id in task_ids] == [item.title for item in items]
+    tags = await tags_by_task(session, task_ids)
+    assert [len(tags[task_id]) for task_id in task_ids] == [0, 1, 0, 1, 0]
+
+
+async def test_bulk_update_none_keeps_field(session):
+    deadline = datetime.now(UTC) + timedelta(days=1)
+    [task_id] = await create_tasks_bulk(
+        session,
+        [TaskCreate(title="t", description="d", priority=2, deadline=deadline)],
+        AUTHOR["id"],
+    )
+    request = TaskBulkUpdateRequest(items=[{"id": task_id, "priority": 5}])
+    assert await update_tasks_bulk(session, request.items, AUTHOR["id"]) == [task_id]
+
+    task = (await session.execute(select(Task).where(Task.id == task_id))).scalar_one()
+    await session.refresh(task)
+    assert (task.title, task.description, task.priority) == ("t", "d", 5)
+    # колонка в миграциях без часового пояса, значения в ней - UTC
+    assert _as_utc(task.deadline) == deadline
+    assert task.is_completed is False
+
+
+async def test_bulk_update_reports_each_item(session):
+    task_ids = await create_tasks_bulk(
+        session, [TaskCreate(title="a"), TaskCreate(title="b")], AUTHOR["id"]
+    )
+    [foreign_id] = await create_tasks_bulk(
+        session, [TaskCreate(title="c")], OTHER_AUTHOR["id"]
+    )
+    bulk = TaskBulkUpdateRequest(
+        items=[
+            {"id": task_ids[1], "title": "B"},
+            {"id": foreign_id, "title": "C"},
+            {"id": task_ids[0]},
+            {"id": 10**6, "title": "X"},
+        ]
+    )
+    result = await update_tasks(bulk, AUTHOR, session)
+
+    assert [(r.index, r.id, r.status) for r in result] == [
+        (0, task_ids[1], "updated"),
+        (1, foreign_id, "not_found"),
+        (2, task_ids[0], "updated"),
+        (3, 10**6, "not_found"),
+    ]
+    titles = await _titles(session, [*task_ids, foreign_id])
+    assert titles == {task_ids[0]: "a", task_ids[1]: "B", foreign_id: "c"}
+
+
+async def test_bulk_delete_only_own_tasks(session):
+    task_ids = await create_tasks_bulk(
+        session, [TaskCreate(title="a"), TaskCreate(title="b")], AUTHOR["id"]
+    )
+    [foreign_id] = await create_tasks_bulk(
+        session, [TaskCreate(title="c")], OTHER_AUTHOR["id"]
+    )
+    result = await delete_tasks(
+        TaskBulkDelete(ids=[foreign_id, task_ids[0]]), AUTHOR, session
+    )
+
+    assert [(r.id, r.status) for r in result] == [
+        (foreign_id, "not_found"),
+        (task_ids[0], "deleted"),
+    ]
+    assert set(await _titles(session, [*task_ids, foreign_id])) == {
+        task_ids[1],
+        foreign_id,
+    }
+    assert await delete_tasks_bulk(session, [task_ids[0]], AUTHOR["id"]) == []
+
+
+async def test_update_returns_task_with_tags(session):
+    [task_id] = await create_tasks_bulk(
+        session,
+        [TaskCreate(title="t", description="d", tag_names=["a", "b"])],
+        AUTHOR["id"],
+    )
+    task = await update_task_by_id(
+        session, task_id, AUTHOR["id"], TaskUpdate(priority=1)
+    )
+
+    assert (task.title, task.description, task.priority) == ("t", "d", 1)
+    assert [tag.name for tag in task.tags] == ["a", "b"]
+
+
+async def test_update_replaces_tags_only_when_given(session):
+    [task_id] = await create_tasks_bulk(
+        session, [TaskCreate(title="t", tag_names=["a"])], AUTHOR["id"]
+    )
+    task = await update_task_by_id(
+        session, task_id, AUTHOR["id"], TaskUpdate(tag_names=["b"])
+    )
+    assert task.title == "t"
+    assert [tag.name for tag in task.tags] == ["b"]
+
+    task = await update_task_by_id(session, task_id, AUTHOR["id"], TaskUpdate())
+    assert [tag.name for tag in task.tags] == ["b"]
+
+    task = await update_task_by_id(
+        session, task_id, AUTHOR["id"], TaskUpdate(tag_ids=[])
+    )
+    assert task.tags == []
+
+
+async def test_update_foreign_task(session):
+    [task_id] = await create_tasks_bulk(
+        session, [TaskCreate(title="t")], OTHER_AUTHOR["id"]
+    )
+    assert (
+        await update_task_by_id(session, task_id, AUTHOR["id"], TaskUpdate(title="x"))
+        is None
+    )
+    assert await _titles(session, [task_id]) == {task_id: "t"}
+
+
+async def _tag_names(session, task_ids):
+    tags = await tags_by_task(session, task_ids)
+    return [sorted(tag.name for tag in tags[task_id]) for task_id in task_ids]
+
+
+async def _tagged_tasks(session):
+    tags = [await create_tag_db(session, name, AUTHOR["id"]) for name in "abc"]
+    task_ids = await create_tasks_bulk(
+        session,
+        [TaskCreate(title="x", tag_names=["a"]), TaskCreate(title="y")],
+        AUTHOR["id"],
+    )
+    return task_ids, {tag.name: tag.id for tag in tags}
+
+
+async def test_change_tags_counts(session):
+    task_ids, tag = await _tagged_tasks(session)
+
+    added, removed = await change_tasks_tags(
+        session, AUTHOR["id"], task_ids, [tag["a"], tag["b"]], "add"
+    )
+    assert (added, removed) == (3, 0)
+    assert await _tag_names(session, task_ids) == [["a", "b"], ["a", "b"]]
+
+    assert await change_tasks_tags(
+        session, AUTHOR["id"], task_ids, [tag["b"], tag["c"]], "replace"
+    ) == (2, 2)
+    assert await _tag_names(session, task_ids) == [["b", "c"], ["b", "c"]]
+
+    assert await change_tasks_tags(
+        session, AUTHOR["id"], task_ids[:1], [tag["c"], tag["a"]], "remove"
+    ) == (0, 1)
+    assert await _tag_names(session, task_ids) == [["b"], ["b", "c"]]
+
+
+async def test_replace_with_no_tags_removes_all(session):
+    task_ids, tag = await _tagged_tasks(session)
+    await change_tasks_tags(session, AUTHOR["id"], task_ids, [tag["b"]], "add")
+
+    assert await change_tasks_tags(session, AUTHOR["id"], task_ids, [], "replace") == (
+        0,
+        3,
+    )
+    assert await _tag_names(session, task_ids) == [[], []]
+    assert await change_tasks_tags(session, AUTHOR["id"], task_ids, [], "remove") == (
+        0,
+        0,
+    )
+
+
+async def test_change_tags_ignores_foreign_tags_and_tasks(session):
+    task_ids, tag = await _tagged_tasks(session)
+    foreign_tag = await create_tag_db(session, "a", OTHER_AUTHOR["id"])
+    [foreign_task_id] = await create_tasks_bulk(
+        session, [TaskCreate(title="z", tag_names=["a"])], OTHER_AUTHOR["id"]
+    )
+
+    assert await change_tasks_tags(
+        session,
+        AUTHOR["id"],
+        [task_ids[1], foreign_task_id],
+        [tag["b"], foreign_tag.id],
+        "add",
+    ) == (1, 0)
+    assert await change_tasks_tags(
+        session, AUTHOR["id"], [task_ids[0], foreign_task_id], [], "replace"
+    ) == (0, 1)
+    assert await _tag_names(session, [*task_ids, foreign_task_id]) == [
+        [],
+        ["b"],
+        ["a"],
+    ]
+
+
+async def test_bulk_update_replaces_tag_pairs(session):
+    task_ids, tag = await _tagged_tasks(session)
+    foreign_tag = await create_tag_db(session, "b", OTHER_AUTHOR["id"])
+    request = TaskBulkUpdateRequest(
+        items=[
+            {"id": task_ids[0], "tag_ids": []},
+            {"id": task_ids[1], "tag_ids": [tag["c"], foreign_tag.id]},
+        ]
+    )
+    await update_tasks_bulk(session, request.items, AUTHOR["id"])
+    assert await _tag_names(session, task_ids) == [[], ["c"]]
+
+    request = TaskBulkUpdateRequest(
+        items=[{"id": task_ids[0], "tag_names": ["a"]}, {"id": task_ids[1]}]
+    )
+    await update_tasks_bulk(session, request.items, AUTHOR["id"])
+    assert await _tag_names(session, task_ids) == [["a"], ["c"]]
+
+
+async def test_tags_are_never_lazy_loaded(session):
+    [task_id] = await create_tasks_bulk(
+        session, [TaskCreate(title="t", tag_names=["a"])], AUTHOR["id"]
+    )
+    session.expunge_all()
+    task = (await session.execute(select(Task))).scalar_one()
+    with pytest.raises(InvalidRequestError):
+        task.tags
+
+    session.expunge_all()
+    task = await get_task_by_id(session, task_id, AUTHOR["id"])
+    assert [tag.name for tag in task.tags] == ["a"]
+    session.expunge_all()
+    [task] = await get_all_tasks_by_author_id(session, AUTHOR["id"])
+    assert [tag.name for tag in task.tags] == ["a"]
+
+
+async def test_task_list_fields_and_cursor(session):
+    task_ids = await create_tasks_bulk(
+        session,
+        [TaskCreate(title="a", priority=2, tag_names=["x"]), TaskCreate(title="b")],
+        AUTHOR["id"],
+    )
+    tasks = await get_all_tasks_by_author_id(
+        session,
+        AUTHOR["id"],
+        limit=1,
+        sort_by="priority",
+        order="asc",
+        cursor="",
+        fields=["title", "tags"],
+    )
+    assert [set(task) for task in tasks] == [{"id", "title", "priority", "tags"}]
+    assert tasks[0]["tags"][0]["name"] == "x"
+
+    cursor = next_cursor(tasks, 1, task_list_cursor_kind("priority", "asc"), "priority")
+    tasks = await get_all_tasks_by_author_id(
+        session,
+        AUTHOR["id"],
+        sort_by="priority",
+        order="asc",
+        cursor=cursor,
+        fields=["title"],
+    )
+    assert tasks == [{"id": task_ids[1], "title": "b", "priority": 3}]
+
+
+async def test_bulk_complete_streams_ids(session, monkeypatch):
+    monkeypatch.setattr("src.routers.task.BULK_IDS_CHUNK_SIZE", 2)
+    task_ids = await create_tasks_bulk(
+        session, [TaskCreate(title=str(i)) for i in range(3)], AUTHOR["id"]
+    )
+    request = BulkCompleteRequest(filter={"all": True})
+
+    assert await complete_tasks(request, True, AUTHOR, session) == BulkCountResponse(
+        count=3
+    )
+    response = await complete_tasks(request, False, AUTHOR, session)
+    chunks = [chunk async for chunk in response.body_iterator]
+
+    assert response.media_type == "application/x-ndjson"
+    assert response.headers["X-Affected-Count"] == "3"
+    assert len(chunks) == 2
+    assert "".join(chunks) == "".join(f'{{"id": {i}}}\n' for i in task_ids)
+    assert await complete_tasks(request, True, AUTHOR, session) == BulkCountResponse(
+        count=0
+    )
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from src.core.pagination import decode_cursor, next_cursor
+from src.crud.task_fields import ALL_TASK_FIELDS, select_tasks, task_rows_to_dicts
+from src.dependencies.fields import task_fields
+
+
+def _fields(fields=None, include=None, shape="embedded"):
+    return task_fields(fields=fields, include=include, shape=shape)
+
+
+def test_all_fields_by_default():
+    assert _fields() == ALL_TASK_FIELDS
+    assert _fields(include="tags") == ALL_TASK_FIELDS
+    assert _fields(shape="normalized") == ALL_TASK_FIELDS
+
+
+def test_fields_are_deduplicated():
+    assert _fields(" title,deadline,title,", "tags, tags") == [
+        "title",
+        "deadline",
+        "tags",
+    ]
+
+
+def test_normalized_shape_includes_tags():
+    assert _fields("title", shape="normalized") == ["title", "tags"]
+    assert _fields("title", "tags", shape="normalized") == ["title", "tags"]
+
+
+@pytest.mark.parametrize(
+    "fields, include, detail",
+    [
+        ("title,secret", None, "Unknown fields: secret"),
+        ("tags", None, "Unknown fields: tags"),
+        ("title", "tags,author", "Unknown include: author"),
+        (None, "author", "Unknown include: author"),
+    ],
+)
+def test_unknown_fields_and_includes(fields, include, detail):
+    with pytest.raises(HTTPException) as error:
+        _fields(fields, include)
+    assert error.value.status_code == 400
+    assert error.value.detail == detail
+
+
+def test_select_tasks_columns():
+    query = select_tasks(["deadline", "title", "tags"], "priority")
+    # id и поле сортировки всегда, порядок - как в TaskResponse
+    assert list(query.selected_columns.keys()) == [
+        "id",
+        "title",
+        "priority",
+        "deadline",
+    ]
+
+
+def test_rows_to_dicts_and_cursor():
+    created_at = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    rows = [(1, "a", created_at, 0.5), (2, "b", None, 0.1)]
+    tasks = task_rows_to_dicts(
+        ["id", "title", "created_at", "rank"],
+        rows,
+        {1: [{"id": 7, "name": "x", "author_id": 1}], 2: []},
+    )
+
+    assert tasks == [
+        {
+            "id": 1,
+            "title": "a",
+            "created_at": created_at,
+            "tags": [{"id": 7, "name": "x", "author_id": 1}],
+        },
+        {"id": 2, "title": "b", "created_at": None, "tags": []},
+    ]
+    assert next_cursor(tasks, 3, "k", "created_at") is None
+    assert decode_cursor(next_cursor(tasks[:1], 1, "k", "created_at"), "k") == (
+        created_at.isoformat(),
+        1,
+    )
+    assert decode_cursor(next_cursor(tasks, 2, "k", "created_at"), "k") == (None, 2)
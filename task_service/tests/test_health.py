@@ -0,0 +1,21 @@
+from src.core import auth_client
+from src.routers.health import auth_health
+
+
+async def test_auth_health_reports_config_and_breaker(monkeypatch):
+    monkeypatch.setattr(auth_client, "AUTH_SERVICE_URL", "http://auth.test")
+    await auth_client.start_auth_client()
+    try:
+        health = await auth_health()
+    finally:
+        await auth_client.close_auth_client()
+
+    assert health["pool"] == {
+        "max_connections": auth_client.limits.max_connections,
+        "max_keepalive_connections": auth_client.limits.max_keepalive_connections,
+        "keepalive_expiry": auth_client.limits.keepalive_expiry,
+        "timeout": auth_client.timeout.read,
+        "connect_timeout": auth_client.timeout.connect,
+        "started": True,
+    }
+    assert health["circuit_breaker"] == auth_client.breaker.snapshot()
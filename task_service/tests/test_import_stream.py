@@ -0,0 +1,75 @@
+import pytest
+
+from src.core.import_stream import ImportFormatError, csv_records, ndjson_records
+
+
+async def chunked(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(records):
+    return [record async for record in records]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_records_across_chunks():
+    body = '\ufeff{"title": "a"}\n\n{"title": "привет"}\n[1]\n{"title":'.encode()
+    # режем посреди многобайтового символа и BOM
+    chunks = [body[i : i + 3] for i in range(0, len(body), 3)]
+
+    records = await collect(ndjson_records(chunked(*chunks)))
+
+    assert records[0] == (1, {"title": "a"})
+    assert records[1] == (2, {"title": "привет"})
+    assert records[2] == (3, "Expected a JSON object")
+    assert records[3][0] == 4
+    assert records[3][1].startswith("Invalid JSON")
+
+
+@pytest.mark.asyncio
+async def test_ndjson_records_keeps_unicode_line_separators():
+    body = '{"title": "a\u2028b"}\n'.encode()
+
+    records = await collect(ndjson_records(chunked(body)))
+
+    assert records == [(1, {"title": "a\u2028b"})]
+
+
+@pytest.mark.asyncio
+async def test_csv_records_multiline_quoted_field():
+    body = (
+        "\ufefftitle,description,priority\n"
+        'a,"first\nsecond ""quoted""",1\n'
+        "b,,\n"
+        "\n"
+        "c,only two\n"
+    ).encode()
+    chunks = [body[i : i + 5] for i in range(0, len(body), 5)]
+
+    records = await collect(csv_records(chunked(*chunks)))
+
+    assert records == [
+        (
+            1,
+            {
+                "title": "a",
+                "description": 'first\nsecond "quoted"',
+                "priority": "1",
+            },
+        ),
+        (2, {"title": "b"}),
+        (3, "Expected 3 values, got 2"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_csv_records_requires_title_column():
+    with pytest.raises(ImportFormatError):
+        await collect(csv_records(chunked(b"name,priority\nx,1\n")))
+
+
+@pytest.mark.asyncio
+async def test_invalid_utf8_rejects_whole_body():
+    with pytest.raises(ImportFormatError):
+        await collect(ndjson_records(chunked(b'{"title": "a"}\n', b"\xff\xfe\n")))
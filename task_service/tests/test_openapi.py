@@ -0,0 +1,14 @@
+import pytest
+
+from src.main import app
+
+
+@pytest.mark.parametrize("path", ["/tasks/bulk/shift_deadline", "/tasks/bulk/complete"])
+def test_bulk_filter_responses_documented(path):
+    response = app.openapi()["paths"][path]["post"]["responses"]["200"]
+
+    assert set(response["content"]) == {"application/json", "application/x-ndjson"}
+    assert response["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/BulkCountResponse"
+    }
+    assert "X-Affected-Count" in response["headers"]
@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.core.pagination import (
+    CursorError,
+    decode_cursor,
+    encode_cursor,
+    next_cursor,
+    peek_cursor_kind,
+)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    cursor = encode_cursor("tasks:created_at:desc", created_at, 42)
+
+    assert "=" not in cursor
+    assert peek_cursor_kind(cursor) == "tasks:created_at:desc"
+    assert decode_cursor(cursor, "tasks:created_at:desc") == (
+        created_at.isoformat(),
+        42,
+    )
+
+
+def test_cursor_with_null_value():
+    cursor = encode_cursor("tasks:deadline:asc", None, 7)
+
+    assert decode_cursor(cursor, "tasks:deadline:asc") == (None, 7)
+
+
+def test_cursor_kind_mismatch():
+    cursor = encode_cursor("tasks:title:asc", "a", 1)
+
+    with pytest.raises(CursorError):
+        decode_cursor(cursor, "tasks:title:desc")
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", "WyJhIiwxXQ"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(CursorError):
+        decode_cursor(cursor, "tasks:title:asc")
+
+
+def test_next_cursor_only_for_full_page():
+    items = [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]
+
+    assert next_cursor(items, 3, "tasks:title:asc", "title") is None
+    cursor = next_cursor(items, 2, "tasks:title:asc", "title")
+    assert decode_cursor(cursor, "tasks:title:asc") == ("b", 2)
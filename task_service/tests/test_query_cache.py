@@ -0,0 +1,138 @@
+import sys
+import time
+import types
+
+import pytest
+
+from src.core.query_cache import (
+    MemoryBackend,
+    QueryCache,
+    RedisBackend,
+    _etag,
+    _etag_matches,
+)
+from src.db.session import ReplicaRouter
+
+
+def test_etag_is_weak_and_depends_on_params():
+    etag = _etag(255, "tasks", {"limit": 10})
+
+    assert etag.startswith('W/"ff-')
+    assert etag != _etag(255, "tasks", {"limit": 20})
+    assert etag != _etag(256, "tasks", {"limit": 10})
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        (None, False),
+        ("", False),
+        ("*", True),
+        ('W/"ff-0123456789abcdef"', True),
+        ('"ff-0123456789abcdef"', True),
+        ('"other", W/"ff-0123456789abcdef"', True),
+        ('W/"100-0123456789abcdef"', False),
+    ],
+)
+def test_etag_matches(if_none_match, matches):
+    assert _etag_matches(if_none_match, 'W/"ff-0123456789abcdef"') is matches
+
+
+class FakeRedisPipeline:
+    def __init__(self, store: dict):
+        self.store = store
+        self.queued: list = []
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    def multi(self):
+        pass
+
+    def set(self, key, value):
+        self.queued.append((key, value))
+
+
+class FakeRedis:
+    """Общее хранилище версий нескольких воркеров вместо сервера Redis."""
+
+    def __init__(self, store: dict):
+        self.store = store
+
+    async def get(self, key):
+        value = self.store.get(key)
+        return None if value is None else str(value).encode()
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def transaction(self, func, *watches, value_from_callable=False):
+        pipe = FakeRedisPipeline(self.store)
+        value = await func(pipe)
+        for key, queued in pipe.queued:
+            self.store[key] = queued
+        return value
+
+
+@pytest.fixture
+def redis_store(monkeypatch):
+    store: dict = {}
+    redis = types.ModuleType("redis")
+    redis.asyncio = types.SimpleNamespace(from_url=lambda url: FakeRedis(store))
+    monkeypatch.setitem(sys.modules, "redis", redis)
+    return store
+
+
+def redis_worker() -> QueryCache:
+    # у redis нет NOTIFY: воркеры видят записи друг друга только по версии
+    return QueryCache(RedisBackend("redis://test", ttl=60), 60, 1 << 20)
+
+
+@pytest.mark.asyncio
+async def test_redis_version_bump_is_not_below_time_ns(redis_store):
+    # версия, созданная давно: INCR поднял бы её только на единицу
+    redis_store["taskcache:v:1"] = 1000
+    cache = redis_worker()
+    before = await cache.version(1)
+
+    await cache.invalidate(1)
+
+    version = await cache.version(1)
+    assert version > before
+    assert version >= time.time_ns() - 10**9
+
+
+@pytest.mark.asyncio
+async def test_redis_write_in_other_worker_keeps_reads_on_primary(
+    redis_store, monkeypatch
+):
+    redis_store["taskcache:v:1"] = 1000
+    writer, reader = redis_worker(), redis_worker()
+    replica = object()
+    router = ReplicaRouter(
+        [replica], sticky_seconds=5, sticky_max_size=100, retry_seconds=30
+    )
+    await writer.invalidate(1)
+
+    assert router.choose(1, await reader.version(1)) is None
+    assert router.choose(2, None) is replica
+
+    now = time.time_ns()
+    monkeypatch.setattr(time, "time_ns", lambda: now + 6 * 10**9)
+    assert router.choose(1, await reader.version(1)) is replica
+
+
+@pytest.mark.asyncio
+async def test_memory_versions_are_bounded():
+    backend = MemoryBackend(maxsize=2, ttl=60)
+    first = await backend.get_version(1)
+    await backend.get_version(2)
+    await backend.get_version(3)
+
+    assert len(backend.versions) == 2
+    # вытесненная версия создаётся заново и не совпадает с прежней
+    assert await backend.get_version(1) > first
+    assert await backend.bump_version(1) > first
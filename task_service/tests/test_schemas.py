@@ -0,0 +1,74 @@
+import pytest
+from pydantic import ValidationError
+
+from src.schemas.tag import TagCreate, TagUpdate
+from src.core.config import TASK_BULK_MAX_ITEMS
+from src.schemas.task import (
+    BulkCompleteRequest,
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkUpdateRequest,
+    TaskFilter,
+    TaskImportRow,
+)
+
+
+@pytest.mark.parametrize(
+    "tags, expected",
+    [
+        ([" a", "a", {"name": "b "}], ["a", "b"]),
+        ('["x", " x"]', ["x"]),
+        ("", []),
+    ],
+)
+def test_import_row_tags(tags, expected):
+    assert TaskImportRow(title="t", tags=tags).tags == expected
+
+
+@pytest.mark.parametrize(
+    "tags", [[["a"]], [{"name": ["a"]}], [{"id": 1}], [" "], "[1", "{}"]
+)
+def test_import_row_invalid_tags_are_row_errors(tags):
+    with pytest.raises(ValidationError):
+        TaskImportRow(title="t", tags=tags)
+
+
+@pytest.mark.parametrize("body", [{}, {"filter": {}}, {"filter": {"all": False}}])
+def test_bulk_filter_must_not_be_empty(body):
+    with pytest.raises(ValidationError):
+        BulkCompleteRequest.model_validate(body)
+
+
+def test_bulk_filter_all_or_condition():
+    assert BulkCompleteRequest.model_validate({"filter": {"all": True}}).filter.all
+    assert TaskFilter(is_completed=False).is_completed is False
+
+
+def test_tag_names_are_stripped():
+    assert TagCreate(name=" a ").name == "a"
+    assert TagUpdate(name="a ").name == "a"
+    assert TagUpdate().name is None
+    with pytest.raises(ValidationError):
+        TagCreate(name="  ")
+
+
+def test_bulk_update_ids_must_be_unique():
+    with pytest.raises(ValidationError, match="Task ids must be unique"):
+        TaskBulkUpdateRequest(items=[{"id": 1}, {"id": 2, "title": "t"}, {"id": 1}])
+    assert len(TaskBulkUpdateRequest(items=[{"id": 1}, {"id": 2}]).items) == 2
+
+
+@pytest.mark.parametrize("count", [0, TASK_BULK_MAX_ITEMS + 1])
+def test_bulk_item_limits(count):
+    with pytest.raises(ValidationError):
+        TaskBulkCreate(items=[{"title": "t"}] * count)
+    with pytest.raises(ValidationError):
+        TaskBulkUpdateRequest(items=[{"id": i} for i in range(count)])
+    with pytest.raises(ValidationError):
+        TaskBulkDelete(ids=list(range(count)))
+
+
+def test_bulk_max_items_accepted():
+    ids = list(range(TASK_BULK_MAX_ITEMS))
+    assert len(TaskBulkCreate(items=[{"title": "t"}] * len(ids)).items) == len(ids)
+    assert TaskBulkDelete(ids=ids).ids == ids
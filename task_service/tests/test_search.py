@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import func, select
+
+from src.core.pagination import CursorError, encode_cursor
+from src.crud.task import _prefix_tsquery, create_tasks_bulk, search_tasks_db
+from src.schemas.task import TaskCreate
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Отчёт КВ", "отчёт:* & кв:*"),
+        ("a&b | c:!'d'", "a:* & b:* & c:* & d:*"),
+        ('"e" (f) <-> g:* \\h', "e:* & f:* & g:* & h:*"),
+        ("snake_case-2", "snake_case:* & 2:*"),
+        ("& | ! : ' \" ( ) <->", None),
+        ("", None),
+    ],
+)
+def test_prefix_tsquery_drops_operators(text, expected):
+    assert _prefix_tsquery(text) == expected
+
+
+@pytest.mark.parametrize(
+    "kind", ["search:fts:0123456789ab", "tasks:created_at:desc", "search:trgm:"]
+)
+async def test_search_rejects_cursor_of_other_query(kind):
+    # проверка курсора идёт до обращения к БД
+    with pytest.raises(CursorError):
+        await search_tasks_db(None, 1, "отчёт", cursor=encode_cursor(kind, 0.5, 1))
+
+
+async def test_search_with_operator_characters(session):
+    task_ids = await create_tasks_bulk(
+        session,
+        [TaskCreate(title="отчёт за квартал"), TaskCreate(title="квартальный план")],
+        1,
+    )
+    text = "кварт & !'отч':*"
+    assert await session.scalar(
+        select(func.to_tsquery("simple", _prefix_tsquery(text)))
+    )
+
+    tasks, cursor = await search_tasks_db(session, 1, text, limit=1)
+    assert [task.id for task in tasks] == [task_ids[0]]
+    with pytest.raises(CursorError):
+        await search_tasks_db(session, 1, "квартал", cursor=cursor)
+    tasks, cursor = await search_tasks_db(session, 1, text, limit=1, cursor=cursor)
+    assert tasks == [] and cursor is None
@@ -0,0 +1,129 @@
+from datetime import datetime, timezone
+
+from src.core.import_stream import csv_records
+from src.core.serialization import csv_lines, normalize_tags, task_list_content
+from src.crud.task_fields import ALL_TASK_FIELDS
+from src.schemas.task import TaskImportRow
+
+DEADLINE = datetime(2025, 1, 2, 3, 4, 5, 600000, tzinfo=timezone.utc)
+
+
+def _task(**values):
+    task = {
+        "id": 1,
+        "title": "a",
+        "description": None,
+        "priority": 3,
+        "created_at": datetime(2024, 12, 31, tzinfo=timezone.utc),
+        "deadline": DEADLINE,
+        "is_completed": True,
+        "author_id": 7,
+        "tags": [{"id": 5, "name": "x", "author_id": 7}],
+    }
+    task.update(values)
+    return task
+
+
+async def chunked(text: str):
+    yield text.encode()
+
+
+def test_csv_values():
+    lines = csv_lines([_task(), _task(is_completed=False, tags=[])], ALL_TASK_FIELDS)
+
+    assert lines.splitlines() == [
+        "1,a,,3,2024-12-31T00:00:00Z,2025-01-02T03:04:05.600000Z,true,7,"
+        '"[{""id"":5,""name"":""x"",""author_id"":7}]"',
+        "1,a,,3,2024-12-31T00:00:00Z,2025-01-02T03:04:05.600000Z,false,7,[]",
+    ]
+
+
+def test_csv_header_and_quoting():
+    lines = csv_lines(
+        [_task(title='a, "b"', description="1\n2", deadline=None)],
+        ["title", "description", "deadline"],
+        header=True,
+    )
+
+    assert lines == 'title,description,deadline\r\n"a, ""b""","1\n2",\r\n'
+
+
+async def test_csv_round_trip_through_import():
+    tasks = [
+        _task(
+            title='a, "b"',
+            description="1\n2",
+            tags=[{"id": 5, "name": "x", "author_id": 7}, {"id": 6, "name": "y"}],
+        ),
+        _task(title="c", deadline=None, is_completed=False, priority=1, tags=[]),
+    ]
+    body = csv_lines([], ALL_TASK_FIELDS, header=True) + csv_lines(
+        tasks, ALL_TASK_FIELDS
+    )
+
+    rows = [
+        TaskImportRow.model_validate(record)
+        async for _, record in csv_records(chunked(body))
+    ]
+
+    assert [row.model_dump() for row in rows] == [
+        {
+            "title": 'a, "b"',
+            "description": "1\n2",
+            "priority": 3,
+            "deadline": DEADLINE,
+            "created_at": tasks[0]["created_at"],
+            "is_completed": True,
+            "tags": ["x", "y"],
+        },
+        {
+            "title": "c",
+            "description": None,
+            "priority": 1,
+            "deadline": None,
+            "created_at": tasks[1]["created_at"],
+            "is_completed": False,
+            "tags": [],
+        },
+    ]
+
+
+def test_normalize_tags_replaces_embedded_tags():
+    shared = {"id": 5, "name": "x", "author_id": 7}
+    tasks = [
+        {"id": 1, "tags": [shared, {"id": 6, "name": "y", "author_id": 7}]},
+        {"id": 2, "tags": [shared]},
+        {"id": 3, "tags": []},
+        {"id": 4},
+    ]
+
+    tags = normalize_tags(tasks)
+
+    assert tasks == [
+        {"id": 1, "tag_ids": [5, 6]},
+        {"id": 2, "tag_ids": [5]},
+        {"id": 3, "tag_ids": []},
+        {"id": 4, "tag_ids": []},
+    ]
+    assert list(tags) == ["5", "6"]
+    assert tags["5"] == shared
+
+
+def test_task_list_content_shapes():
+    def tasks():
+        return [{"id": 1, "tags": [{"id": 5, "name": "x", "author_id": 7}]}]
+
+    assert task_list_content(tasks()) == tasks()
+    assert task_list_content(tasks(), paginated=True, next_cursor="c") == {
+        "items": tasks(),
+        "next_cursor": "c",
+    }
+    normalized = {
+        "items": [{"id": 1, "tag_ids": [5]}],
+        "tags": {"5": {"id": 5, "name": "x", "author_id": 7}},
+    }
+    assert task_list_content(tasks(), "normalized") == normalized
+    page = task_list_content(tasks(), "normalized", paginated=True, next_cursor="c")
+    assert page == {**normalized, "next_cursor": "c"}
+    # next_cursor - последним ключом, после словаря тегов
+    assert list(page) == ["items", "tags", "next_cursor"]
@@ -0,0 +1,132 @@
+from sqlalchemy import delete, update
+
+from src.crud.stats import get_task_stats
+from src.crud.tag import create_tag_db, delete_tag_by_id
+from src.crud.task import create_tasks_bulk, delete_tasks_bulk, update_tasks_bulk
+from src.jobs.reconcile_stats import (
+    find_tag_stats_drift,
+    find_task_stats_drift,
+    repair_tag_stats,
+    repair_task_stats,
+)
+from src.models.stats import TagStats, TaskStats
+from src.schemas.task import TaskBulkUpdateRequest, TaskCreate
+
+AUTHOR_ID = 1
+
+
+def _counts(stats):
+    return (
+        stats["total"],
+        stats["completed"],
+        [stats["by_priority"][str(p)] for p in range(1, 6)],
+        {tag["name"]: tag["task_count"] for tag in stats["tags"]},
+    )
+
+
+async def _create(session, *items):
+    return await create_tasks_bulk(session, list(items), AUTHOR_ID)
+
+
+async def test_triggers_track_task_writes(session):
+    assert _counts(await get_task_stats(session, AUTHOR_ID)) == (
+        0,
+        0,
+        [0] * 5,
+        {},
+    )
+    task_ids = await _create(
+        session,
+        TaskCreate(title="a", priority=1, tag_names=["x", "y"]),
+        TaskCreate(title="b", priority=5, tag_names=["x"]),
+        TaskCreate(title="c"),
+    )
+    assert _counts(await get_task_stats(session, AUTHOR_ID)) == (
+        3,
+        0,
+        [1, 0, 1, 0, 1],
+        {"x": 2, "y": 1},
+    )
+
+    request = TaskBulkUpdateRequest(
+        items=[
+            {"id": task_ids[0], "is_completed": True, "priority": 2},
+            {"id": task_ids[1], "title": "B", "tag_names": []},
+            {"id": task_ids[2], "title": "C"},
+        ]
+    )
+    await update_tasks_bulk(session, request.items, AUTHOR_ID)
+    assert _counts(await get_task_stats(session, AUTHOR_ID)) == (
+        3,
+        1,
+        [0, 1, 1, 0, 1],
+        {"x": 1, "y": 1},
+    )
+
+    await delete_tasks_bulk(session, task_ids[:2], AUTHOR_ID)
+    assert _counts(await get_task_stats(session, AUTHOR_ID)) == (
+        1,
+        0,
+        [0, 0, 1, 0, 0],
+        {"x": 0, "y": 0},
+    )
+
+
+async def test_tag_delete_cascades_to_tag_stats(session):
+    tag = await create_tag_db(session, "x", AUTHOR_ID)
+    await _create(session, TaskCreate(title="a", tags=[tag]))
+    assert await session.get(TagStats, tag.id) is not None
+
+    assert await delete_tag_by_id(session, tag.id, AUTHOR_ID)
+    session.expunge_all()
+    assert await session.get(TagStats, tag.id) is None
+    assert await find_tag_stats_drift(session) == []
+
+
+async def test_reconcile_repairs_drift(session):
+    await _create(
+        session,
+        TaskCreate(title="a", priority=2, tag_names=["x"]),
+        TaskCreate(title="b", tag_names=["x", "y"]),
+    )
+    other_ids = await create_tasks_bulk(session, [TaskCreate(title="c")], 2)
+    expected = _counts(await get_task_stats(session, AUTHOR_ID))
+    assert await find_task_stats_drift(session) == []
+    assert await find_tag_stats_drift(session) == []
+
+    await session.execute(
+        update(TaskStats).where(TaskStats.author_id == AUTHOR_ID).values(total=10)
+    )
+    await session.execute(delete(TaskStats).where(TaskStats.author_id == 2))
+    await session.execute(update(TagStats).values(task_count=0))
+    await session.commit()
+
+    assert sorted(await find_task_stats_drift(session)) == [AUTHOR_ID, 2]
+    tag_ids = await find_tag_stats_drift(session)
+    assert len(tag_ids) == 2
+    await session.rollback()
+
+    for author_id in (AUTHOR_ID, 2):
+        await repair_task_stats(session, author_id)
+    for tag_id in tag_ids:
+        await repair_tag_stats(session, tag_id)
+    session.expunge_all()
+
+    assert await find_task_stats_drift(session) == []
+    assert await find_tag_stats_drift(session) == []
+    assert _counts(await get_task_stats(session, AUTHOR_ID)) == expected
+    assert (await get_task_stats(session, 2))["total"] == len(other_ids)
+
+
+async def test_repair_without_tasks_or_tag(session):
+    await _create(session, TaskCreate(title="a"))
+    await session.execute(delete(TaskStats))
+    await session.commit()
+    assert await find_task_stats_drift(session) == [AUTHOR_ID]
+
+    # у автора нет задач, тег удалён: чинить нечего, строки остаются нулевыми
+    await repair_task_stats(session, 3)
+    await repair_tag_stats(session, 10**6)
+    assert await find_task_stats_drift(session) == [AUTHOR_ID]
+    assert (await get_task_stats(session, 3))["total"] == 0
+    assert await session.get(TagStats, 10**6) is None